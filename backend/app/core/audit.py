@@ -1,8 +1,150 @@
+import logging
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.db.session import SessionLocal
 from app.models.audit_log import AuditLog
+from app.services.dashboard import IGNORED_AUDIT_ACTIONS, invalidate_overview
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """Buffers audit entries in memory and bulk-inserts them from a background thread."""
+    
+    def __init__(self, flush_size: int, flush_interval: float, retry_attempts: int = 3, retry_base: float = 0.5):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.retry_attempts = max(retry_attempts, 1)
+        self.retry_base = retry_base
+        self.dropped = 0
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """Start the background flush worker."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the worker and write out everything still queued."""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        # Entries enqueued while the worker was exiting
+        self._drain()
+    
+    def enqueue(self, entry: dict):
+        self._queue.put(entry)
+    
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+        self._drain()
+    
+    def _collect(self) -> List[dict]:
+        """Wait for up to flush_size entries or until flush_interval elapses."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.flush_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+    
+    def _write(self, batch: List[dict]):
+        """
+        Insert a batch. Connection-level errors are retried with exponential
+        backoff; any other error falls back to writing the rows one at a time,
+        so only the rows the database rejects are dropped.
+        """
+        for attempt in range(self.retry_attempts):
+            try:
+                self._insert(batch)
+                return
+            except OperationalError as e:
+                if attempt + 1 == self.retry_attempts:
+                    self._drop(batch, f"database unavailable after {self.retry_attempts} attempts: {e!r}")
+                    return
+                delay = self.retry_base * (2 ** attempt)
+                logger.warning("Audit flush failed (%r), retrying %d entries in %.1fs", e, len(batch), delay)
+                time.sleep(delay)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._drop(batch, repr(e))
+                    return
+                logger.warning("Audit flush of %d entries failed, writing them one at a time: %r", len(batch), e)
+                break
+        
+        for entry in batch:
+            try:
+                self._insert([entry])
+            except Exception as e:
+                self._drop([entry], repr(e))
+    
+    def _insert(self, batch: List[dict]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(AuditLog), batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if any(entry["action"] not in IGNORED_AUDIT_ACTIONS for entry in batch):
+            invalidate_overview()
+    
+    def _drop(self, entries: List[dict], reason: str):
+        self.dropped += len(entries)
+        actions = sorted({entry["action"] for entry in entries})
+        logger.error("Dropped %d audit entries (%s): %s", len(entries), ", ".join(actions), reason)
+
+
+# Global audit writer instance (started/stopped by the app lifespan)
+audit_writer = AuditWriter(
+    flush_size=settings.AUDIT_FLUSH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    retry_attempts=settings.AUDIT_WRITE_ATTEMPTS,
+    retry_base=settings.AUDIT_RETRY_BASE_SECONDS,
+)
 
 
 def log_action(
@@ -13,14 +155,54 @@ def log_action(
     resource_id: Optional[str] = None,
     meta_json: Optional[dict] = None,
 ):
-    """Create an audit log entry."""
-    audit_log = AuditLog(
-        user_id=user_id,
-        action=action,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        meta_json=meta_json or {},
-        created_at=datetime.utcnow(),
-    )
-    db.add(audit_log)
+    """
+    Create an audit log entry.
+    Queued for the background writer when it is running; otherwise written
+    immediately through the given session (scripts, app not started).
+    """
+    entry = _entry(user_id, action, resource_type, resource_id, meta_json)
+    if audit_writer.running:
+        audit_writer.enqueue(entry)
+        return
+    
+    db.add(AuditLog(**entry))
     db.commit()
+    if action not in IGNORED_AUDIT_ACTIONS:
+        invalidate_overview()
+
+
+async def log_action_async(
+    db: AsyncSession,
+    user_id: int,
+    action: str,
+    resource_type: str,
+    resource_id: Optional[str] = None,
+    meta_json: Optional[dict] = None,
+):
+    """log_action() for an AsyncSession."""
+    entry = _entry(user_id, action, resource_type, resource_id, meta_json)
+    if audit_writer.running:
+        audit_writer.enqueue(entry)
+        return
+    
+    db.add(AuditLog(**entry))
+    await db.commit()
+    if action not in IGNORED_AUDIT_ACTIONS:
+        invalidate_overview()
+
+
+def _entry(
+    user_id: int,
+    action: str,
+    resource_type: str,
+    resource_id: Optional[str],
+    meta_json: Optional[dict],
+) -> dict:
+    return {
+        "user_id": user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "meta_json": meta_json or {},
+        "created_at": datetime.utcnow(),
+    }
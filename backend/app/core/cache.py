@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-memory cache with per-entry expiry and LRU eviction."""
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value; ttl overrides the default expiry for this entry."""
+        if ttl is None:
+            ttl = self.ttl_seconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def delete_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove every entry whose value matches predicate; returns the count removed."""
+        with self._lock:
+            keys = [k for k, (_, value) in self._data.items() if predicate(value)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self) -> dict:
+        """Size and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -6,12 +6,27 @@ from typing import List, Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./test.db"
+    # Connection pool (shared by the sync and async engines, each gets its own pool)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_POOL_RECYCLE_SECONDS: int = 30 * 60
+    # Pre-ping: "always" (every checkout), "idle" (after DB_POOL_PING_IDLE_SECONDS unused) or "never"
+    DB_POOL_PRE_PING: str = "idle"
+    DB_POOL_PING_IDLE_SECONDS: float = 30.0
+    # SQLite only
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CHECK_SAME_THREAD: bool = False
     
     # JWT
     JWT_SECRET: str = "change-me-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
     
+    # Token -> user resolution cache
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 1024
+    
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
@@ -23,9 +38,71 @@ class Settings(BaseSettings):
     EXTERNAL_API_KEY: Optional[str] = None
     EXTERNAL_API_URL: Optional[str] = None
     EXTERNAL_API_TIMEOUT_SECONDS: int = 30
+    # Shared connection pool to the external API (HTTP/2 needs the `h2` package)
+    EXTERNAL_HTTP_MAX_CONNECTIONS: int = 20
+    EXTERNAL_HTTP_MAX_KEEPALIVE: int = 10
+    EXTERNAL_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    EXTERNAL_HTTP2: bool = False
+    # Resilience: in-flight cap, retries (exponential backoff + jitter), circuit breaker
+    EXTERNAL_MAX_IN_FLIGHT: int = 8
+    EXTERNAL_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    EXTERNAL_RETRY_ATTEMPTS: int = 3
+    EXTERNAL_RETRY_BASE_SECONDS: float = 0.5
+    EXTERNAL_RETRY_MAX_SECONDS: float = 8.0
+    EXTERNAL_BREAKER_FAILURE_THRESHOLD: int = 5
+    EXTERNAL_BREAKER_RESET_SECONDS: float = 30.0
+    # Response cache for identical prompts: "memory", "sqlite" or "none"
+    EXTERNAL_CACHE_BACKEND: str = "memory"
+    EXTERNAL_CACHE_TTL_SECONDS: int = 60 * 60
+    EXTERNAL_CACHE_MAX_SIZE: int = 512
+    EXTERNAL_CACHE_PATH: str = "external_cache.sqlite3"
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 20
+    # "memory" (per process) or "db" (shared rate_limits table, holds across workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    
+    # Audit log writer (buffered, flushed in batches by a background thread)
+    AUDIT_FLUSH_SIZE: int = 100
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_WRITE_ATTEMPTS: int = 3  # batch attempts on connection errors before row-by-row fallback
+    AUDIT_RETRY_BASE_SECONDS: float = 0.5  # backoff doubles per attempt
+    
+    # Application log level (request lines are INFO, N+1 flags are WARNING)
+    LOG_LEVEL: str = "WARNING"
+    
+    # Per-request timing / DB statement instrumentation
+    REQUEST_LOG_ENABLED: bool = True
+    REQUEST_METRICS_WINDOW: int = 1000  # recent requests per route kept for percentiles
+    REQUEST_N_PLUS_ONE_THRESHOLD: int = 20  # statements per request before it is flagged
+    
+    # Readiness probe (/health/ready)
+    HEALTH_CACHE_SECONDS: float = 5.0
+    HEALTH_DB_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_DB_SLOW_MS: int = 500  # slower SELECT 1 reports "degraded"
+    HEALTH_MIN_FREE_DISK_MB: int = 100
+    
+    # Prometheus /metrics: when set, scrapes must send "Authorization: Bearer <token>"
+    METRICS_TOKEN: Optional[str] = None
+    
+    # Admin overview result cache
+    OVERVIEW_CACHE_TTL_SECONDS: int = 5
+    
+    # Server-pushed message events (SSE)
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+    EVENTS_QUEUE_SIZE: int = 100
+    
+    # Thumbnail / medium variant rendering
+    THUMBNAIL_WORKERS: int = 2
+    
+    # Picture directory catalog: how often the directory mtime is re-checked
+    PICTURE_CATALOG_CHECK_SECONDS: float = 2.0
+    
+    # Signed media URLs (falls back to JWT_SECRET when no dedicated secret is set)
+    MEDIA_URL_SECRET: Optional[str] = None
+    MEDIA_URL_TTL_SECONDS: int = 6 * 60 * 60
+    # Expiry is rounded up to this bucket so re-issued URLs stay byte-identical
+    MEDIA_URL_BUCKET_SECONDS: int = 60 * 60
 
     @field_validator("DATABASE_URL")
     @classmethod
@@ -34,6 +111,14 @@ class Settings(BaseSettings):
             return v.replace("postgres://", "postgresql://", 1)
         return v
     
+    @field_validator("DB_POOL_PRE_PING")
+    @classmethod
+    def check_pre_ping(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("always", "idle", "never"):
+            raise ValueError("DB_POOL_PRE_PING must be 'always', 'idle' or 'never'")
+        return v
+    
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
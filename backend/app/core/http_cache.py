@@ -0,0 +1,144 @@
+"""
+Conditional (ETag / If-Modified-Since) and byte-range file responses.
+
+Starlette's FileResponse always sends the full body, so image endpoints use
+cached_file_response to answer revalidations with 304 and range requests
+with 206.
+"""
+import os
+import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.services.blob_store import hash_file
+
+# Content-addressed / approved media never changes under the same URL
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+# Auth-gated media: browser cache only, revalidated with the ETag
+CACHE_PRIVATE = "private, max-age=86400"
+# Admin previews of unapproved media
+CACHE_NO_STORE = "private, no-store"
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# (path, mtime_ns, size) -> sha256, so unchanged files are hashed once
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+
+def file_etag(path: Path) -> str:
+    """Strong ETag from the file's SHA-256, memoized on (path, mtime, size)."""
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _hash_lock:
+        digest = _hash_cache.get(key)
+    if digest is None:
+        digest = hash_file(path)
+        with _hash_lock:
+            _hash_cache[key] = digest
+    return f'"{digest}"'
+
+
+def variant_etag(etag: str, variant: str) -> str:
+    """ETag of a derived variant (deterministic from the original's content)."""
+    return f'{etag[:-1]}-{variant}"'
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=a-b' range; None means unsatisfiable / unsupported."""
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+    if not start_str:
+        # Suffix range: last N bytes
+        length = int(end_str)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _iter_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def cached_file_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    etag: str,
+    cache_control: str,
+    filename: Optional[str] = None,
+) -> Response:
+    """Serve a file honoring If-None-Match / If-Modified-Since and single byte ranges."""
+    stat = path.stat()
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if filename:
+        headers["Content-Disposition"] = f"inline; filename*=utf-8''{quote(filename)}"
+    
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = _parse_range(range_header, stat.st_size)
+        if byte_range is None:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{stat.st_size}"},
+            )
+        start, end = byte_range
+        length = end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        headers["Content-Length"] = str(length)
+        return StreamingResponse(
+            _iter_file(path, start, length),
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+    
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=os.stat(path))
@@ -0,0 +1,66 @@
+"""
+HMAC-signed, expiring media URLs.
+
+List endpoints authorize the caller once and hand out URLs of the form
+/media/{kind}/{name}/{size}?uid=...&exp=...&sig=...; the media router only
+has to check the signature and open the file, without touching the DB.
+"""
+import base64
+import hashlib
+import hmac
+import time
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from app.core.config import settings
+from app.services import thumbnails
+
+MEDIA_PREFIX = "/media"
+PHOTO = "photo"
+PICTURE = "picture"
+MEDIA_KINDS = {PHOTO, PICTURE}
+
+
+def _secret() -> bytes:
+    return (settings.MEDIA_URL_SECRET or settings.JWT_SECRET).encode("utf-8")
+
+
+def _payload(kind: str, name: str, size: str, user_id: int, exp: int) -> bytes:
+    return "\n".join([kind, name, size, str(user_id), str(exp)]).encode("utf-8")
+
+
+def sign(kind: str, name: str, size: str, user_id: int, exp: int) -> str:
+    """URL-safe HMAC-SHA256 signature over the media path, user and expiry."""
+    digest = hmac.new(_secret(), _payload(kind, name, size, user_id, exp), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def verify(kind: str, name: str, size: str, user_id: int, exp: int, sig: str) -> bool:
+    """Constant-time signature check; expired URLs never verify."""
+    if exp < int(time.time()):
+        return False
+    return hmac.compare_digest(sign(kind, name, size, user_id, exp), sig)
+
+
+def expiry(now: Optional[float] = None) -> int:
+    """
+    Expiry rounded up to the next bucket boundary, so every URL issued within
+    a bucket is identical and browsers / CDNs keep hitting the same cache key.
+    """
+    now = int(now if now is not None else time.time())
+    bucket = max(settings.MEDIA_URL_BUCKET_SECONDS, 1)
+    return ((now + settings.MEDIA_URL_TTL_SECONDS) // bucket + 1) * bucket
+
+
+def media_url(kind: str, name: str, size: str, user_id: int, exp: Optional[int] = None) -> str:
+    """Signed path (relative to the API base URL) for one media variant."""
+    exp = exp if exp is not None else expiry()
+    sig = sign(kind, name, size, user_id, exp)
+    return f"{MEDIA_PREFIX}/{kind}/{quote(name, safe='')}/{size}?uid={user_id}&exp={exp}&sig={sig}"
+
+
+def media_urls(kind: str, name: str, user_id: int, exp: Optional[int] = None) -> Dict[str, str]:
+    """Signed URLs for the original and every rendered variant of a file."""
+    exp = exp if exp is not None else expiry()
+    sizes = [thumbnails.ORIGINAL] + list(thumbnails.VARIANTS)
+    return {size: media_url(kind, name, size, user_id, exp) for size in sizes}
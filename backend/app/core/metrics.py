@@ -0,0 +1,172 @@
+"""
+Prometheus metrics served at /metrics.
+
+Counters and histograms are updated in-process as requests happen; gauges
+for the DB pools, external API client, circuit breaker and response cache
+are read from in-memory state when scraped. A scrape never queries the
+database.
+"""
+from typing import Any, Dict, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, disable_created_metrics
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy.engine import Engine
+
+from app.db.pool import pool_stats
+from app.services.resilience import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+
+# No *_created series: they double the scrape size and nothing here uses them
+disable_created_metrics()
+
+# Own registry: only the series below, no process / platform collectors
+registry = CollectorRegistry()
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled",
+    ["router", "method", "route", "status"], registry=registry
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request wall time",
+    ["router", "method", "route"], registry=registry
+)
+HTTP_DB_DURATION = Histogram(
+    "http_request_db_seconds", "Time spent in DB statements per HTTP request",
+    ["router"], registry=registry,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+HTTP_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "DB statements per HTTP request",
+    ["router"], registry=registry,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+HTTP_N_PLUS_ONE = Counter(
+    "http_n_plus_one_total", "Requests flagged as likely N+1 query patterns",
+    ["router", "route"], registry=registry
+)
+IMAGE_BYTES_SERVED = Counter(
+    "image_bytes_served_total", "Bytes of image/* response bodies sent",
+    ["router"], registry=registry
+)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total", "Rate limiter decisions",
+    ["result"], registry=registry
+)
+EXTERNAL_CALLS = Counter(
+    "external_api_calls_total", "External API calls by outcome",
+    ["mode", "status", "cache"], registry=registry
+)
+EXTERNAL_ERRORS = Counter(
+    "external_api_errors_total", "Failed or rejected external API calls",
+    ["mode", "error_type"], registry=registry
+)
+EXTERNAL_DURATION = Histogram(
+    "external_api_duration_seconds", "External API call latency (whole stream for streaming)",
+    ["mode", "status"], registry=registry,
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+)
+EXTERNAL_TTFT = Histogram(
+    "external_api_time_to_first_token_seconds", "Time to the first streamed chunk",
+    registry=registry,
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+)
+
+CIRCUIT_STATES = (CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN)
+
+
+def observe_request(
+    router: str, method: str, route: str, status_code: int,
+    duration: float, db_time: float, db_statements: int, n_plus_one: bool
+):
+    HTTP_REQUESTS.labels(router, method, route, str(status_code)).inc()
+    HTTP_DURATION.labels(router, method, route).observe(duration)
+    HTTP_DB_DURATION.labels(router).observe(db_time)
+    HTTP_DB_STATEMENTS.labels(router).observe(db_statements)
+    if n_plus_one:
+        HTTP_N_PLUS_ONE.labels(router, route).inc()
+
+
+def observe_external_call(meta: Dict[str, Any]):
+    """Record an external call from the same meta that goes into its EXTERNAL_CALL audit entry."""
+    mode = "stream" if meta.get("stream") else "call"
+    status = meta.get("status", "unknown")
+    EXTERNAL_CALLS.labels(mode, status, meta.get("cache", "none")).inc()
+    if meta.get("error_type"):
+        EXTERNAL_ERRORS.labels(mode, meta["error_type"]).inc()
+    if meta.get("latency_ms") is not None:
+        EXTERNAL_DURATION.labels(mode, status).observe(meta["latency_ms"] / 1000)
+    if meta.get("ttft_ms") is not None:
+        EXTERNAL_TTFT.observe(meta["ttft_ms"] / 1000)
+
+
+class RuntimeCollector:
+    """Scrape-time gauges from in-memory state (pools, client, breaker, cache)."""
+
+    def __init__(self, engines: Dict[str, Engine], external_client, external_guard, external_cache):
+        self.engines = engines
+        self.external_client = external_client
+        self.external_guard = external_guard
+        self.external_cache = external_cache
+
+    def collect(self):
+        yield from self._pool_metrics()
+        yield from self._external_metrics()
+
+    def _pool_metrics(self):
+        gauges = {
+            "size": GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"]),
+            "in_use": GaugeMetricFamily("db_pool_in_use", "Connections checked out", labels=["engine"]),
+            "idle": GaugeMetricFamily("db_pool_idle", "Connections idle in the pool", labels=["engine"]),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "Overflow connections open", labels=["engine"]),
+            "wait_ms_p95": GaugeMetricFamily(
+                "db_pool_checkout_wait_p95_seconds", "p95 checkout wait over recent checkouts", labels=["engine"]
+            ),
+        }
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Pool checkouts", labels=["engine"])
+        timeouts = CounterMetricFamily("db_pool_timeouts", "Checkouts that timed out", labels=["engine"])
+        for name, engine in self.engines.items():
+            stats = pool_stats(engine)
+            if "in_use" not in stats:
+                # Untimed pool (in-memory SQLite)
+                continue
+            for key, gauge in gauges.items():
+                value = stats[key] / 1000 if key == "wait_ms_p95" else stats[key]
+                gauge.add_metric([name], value)
+            checkouts.add_metric([name], stats["checkouts"])
+            timeouts.add_metric([name], stats["timeouts"])
+        yield from gauges.values()
+        yield checkouts
+        yield timeouts
+
+    def _external_metrics(self):
+        client = self.external_client
+        yield GaugeMetricFamily("external_api_in_flight", "External API requests in flight", value=client.in_flight)
+        yield CounterMetricFamily("external_api_http_requests", "HTTP requests sent upstream", value=client.requests_total)
+
+        guard = self.external_guard
+        circuit = guard.breaker.stats()
+        state = GaugeMetricFamily("external_api_circuit_state", "1 for the current circuit state", labels=["state"])
+        for name in CIRCUIT_STATES:
+            state.add_metric([name], 1 if circuit["state"] == name else 0)
+        yield state
+        yield CounterMetricFamily("external_api_retries", "Upstream attempts retried", value=guard.retries)
+        yield CounterMetricFamily("external_api_queue_timeouts", "Calls rejected waiting for a slot", value=guard.queue_timeouts)
+        yield CounterMetricFamily("external_api_circuit_rejections", "Calls rejected by the open circuit", value=circuit["rejected"])
+
+        cache = self.external_cache
+        lookups = CounterMetricFamily("external_cache_lookups", "Response cache lookups", labels=["result"])
+        lookups.add_metric(["hit"], cache.hits)
+        lookups.add_metric(["miss"], cache.misses)
+        lookups.add_metric(["coalesced"], cache.coalesced)
+        yield lookups
+        yield CounterMetricFamily("external_cache_errors", "Cache backend reads/writes that failed", value=cache.errors)
+
+
+_runtime_collector: Optional[RuntimeCollector] = None
+
+
+def register_runtime_collector(collector: RuntimeCollector):
+    """Register the scrape-time collector once (main.py may be imported more than once in tests)."""
+    global _runtime_collector
+    if _runtime_collector is None:
+        registry.register(collector)
+        _runtime_collector = collector
@@ -0,0 +1,90 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor token."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor token back into its (created_at, id) position."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at_str, row_id_str = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at_str), int(row_id_str)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after_cursor(model: Any, cursor: str):
+    """Filter clause for rows strictly after the cursor position."""
+    created_at, row_id = decode_cursor(cursor)
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < row_id),
+    )
+
+
+def _split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the next cursor from the last kept row."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0] if isinstance(rows[-1], Row) else rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+def paginate(
+    query: Query,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Keyset pagination on (created_at, id), newest first.
+    Returns the page rows and the cursor for the next page (None on the last page).
+    Rows may be model instances or tuples whose first element is the model.
+    """
+    if cursor:
+        query = query.filter(_after_cursor(model, cursor))
+    
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    return _split_page(rows, limit)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """paginate() for a select() statement on an AsyncSession."""
+    if cursor:
+        stmt = stmt.where(_after_cursor(model, cursor))
+    
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    result = await db.execute(stmt)
+    # Single-entity selects come back as model instances, joins as Rows
+    rows = list(result.scalars().all() if len(stmt.column_descriptions) == 1 else result.all())
+    return _split_page(rows, limit)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Expose the next-page cursor to the client."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
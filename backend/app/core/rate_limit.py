@@ -1,37 +1,159 @@
-from collections import defaultdict
-from datetime import datetime, timedelta
-from fastapi import HTTPException, status
+"""
+GCRA (generic cell rate algorithm) rate limiter.
+
+Each key stores a single float, its theoretical arrival time (TAT), so the
+state is constant-size regardless of the limit. The "memory" backend keeps it
+in-process; the "db" backend keeps it in the rate_limits table, updated with
+one atomic upsert, so the limit holds across uvicorn workers and instances.
+"""
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_DECISIONS
+from app.db.session import SessionLocal
+from app.models.rate_limit import RateLimitState
+
+# Response headers browsers need to be allowed to read (CORS expose_headers)
+RATE_LIMIT_HEADERS = ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After"]
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: float
+    retry_after: float
+    window_seconds: int
+    
+    def headers(self) -> Dict[str, str]:
+        """RateLimit-* headers (IETF draft) plus Retry-After when rejected."""
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_seconds)),
+            "RateLimit-Policy": f"{self.limit};w={self.window_seconds}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+
+class MemoryRateLimitBackend:
+    """Per-process TATs; keys whose TAT has passed are pruned periodically."""
+    
+    PRUNE_EVERY = 1000
+    
+    def __init__(self):
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+    
+    def acquire(self, key: str, now: float, interval: float, window: float) -> Tuple[bool, float]:
+        """Return (allowed, TAT after this request)."""
+        with self._lock:
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                # A TAT in the past is the same as no entry at all
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+            new_tat = max(self._tats.get(key, now), now) + interval
+            if new_tat - window > now:
+                return False, self._tats[key]
+            self._tats[key] = new_tat
+            return True, new_tat
+
+
+class DatabaseRateLimitBackend:
+    """
+    Shared TATs in the rate_limits table. The GCRA check and update happen in
+    one INSERT ... ON CONFLICT DO UPDATE ... WHERE ... RETURNING statement, so
+    concurrent workers can't both take the last slot.
+    """
+    
+    def acquire(self, key: str, now: float, interval: float, window: float) -> Tuple[bool, float]:
+        db = SessionLocal()
+        try:
+            table = RateLimitState.__table__
+            if db.bind.dialect.name == "postgresql":
+                insert, greatest = postgresql.insert, func.greatest
+            else:
+                insert, greatest = sqlite.insert, func.max
+            stmt = insert(table).values(key=key, tat=now + interval)
+            new_tat = greatest(table.c.tat, now) + interval
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={"tat": new_tat},
+                where=(new_tat - window <= now)
+            ).returning(table.c.tat)
+            row = db.execute(stmt).first()
+            if row is None:
+                tat = db.query(RateLimitState.tat).filter(RateLimitState.key == key).scalar()
+                db.commit()
+                return False, tat
+            db.commit()
+            return True, row[0]
+        finally:
+            db.close()
 
 
 class RateLimiter:
-    """Simple in-memory rate limiter."""
+    """GCRA limiter: `max_requests` per `window_seconds`, bursts up to the full quota."""
     
-    def __init__(self, max_requests: int, window_seconds: int = 60):
+    def __init__(self, max_requests: int, window_seconds: int = 60, backend=None):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
-    
-    def check_rate_limit(self, user_id: int):
-        """Check if user has exceeded rate limit."""
-        now = datetime.utcnow()
-        window_start = now - timedelta(seconds=self.window_seconds)
-        
-        # Clean old requests
-        self.requests[user_id] = [
-            req_time for req_time in self.requests[user_id]
-            if req_time > window_start
-        ]
-        
-        # Check limit
-        if len(self.requests[user_id]) >= self.max_requests:
+        self.backend = backend or MemoryRateLimitBackend()
+    
+    def check(self, key: str) -> RateLimitResult:
+        now = time.time()
+        interval = self.window_seconds / self.max_requests
+        allowed, tat = self.backend.acquire(key, now, interval, self.window_seconds)
+        used = max(tat - now, 0.0)
+        remaining = max(int((self.window_seconds - used) // interval), 0)
+        retry_after = 0.0 if allowed else max(tat + interval - self.window_seconds - now, 0.0)
+        RATE_LIMIT_DECISIONS.labels("allowed" if allowed else "rejected").inc()
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.max_requests,
+            remaining=remaining,
+            reset_seconds=used,
+            retry_after=retry_after,
+            window_seconds=self.window_seconds
+        )
+    
+    def check_rate_limit(self, user_id: int, response: Optional[Response] = None) -> RateLimitResult:
+        """
+        Check if user has exceeded rate limit; raises 429 with Retry-After if so.
+        RateLimit-* headers are set on `response` when given.
+        """
+        result = self.check(f"external:{user_id}")
+        if not result.allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Rate limit exceeded. Max {self.max_requests} requests per minute.",
+                headers=result.headers(),
             )
-        
-        # Record this request
-        self.requests[user_id].append(now)
+        if response is not None:
+            response.headers.update(result.headers())
+        return result
+
+
+def _build_backend():
+    kind = settings.RATE_LIMIT_BACKEND.lower()
+    if kind == "db":
+        return DatabaseRateLimitBackend()
+    if kind != "memory":
+        print(f"⚠️  Unknown RATE_LIMIT_BACKEND={kind!r}; using in-memory rate limits")
+    return MemoryRateLimitBackend()
 
 
 # Global rate limiter instance
-rate_limiter = RateLimiter(max_requests=20, window_seconds=60)
+rate_limiter = RateLimiter(max_requests=settings.RATE_LIMIT_PER_MINUTE, window_seconds=60, backend=_build_backend())
@@ -0,0 +1,222 @@
+"""
+Per-request timing and DB statement instrumentation.
+
+RequestMetricsMiddleware measures wall time per route, while SQLAlchemy
+cursor events add the statement count and DB time of the request it runs in
+(tracked through a context variable, which also reaches threadpool endpoints
+and the async engine's greenlets). Each request gets a Server-Timing header
+and one JSON line on this module's logger at INFO; rolling per-route p50/p95/p99 are kept for
+/admin/metrics/requests, and requests over REQUEST_N_PLUS_ONE_THRESHOLD
+statements are flagged as likely N+1 patterns (logged at WARNING). The same observations feed
+the Prometheus series in app.core.metrics.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import IMAGE_BYTES_SERVED, observe_request
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# Requests that matched no route share one bucket (keeps the route set bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+# Router label for routes declared on the app itself (/, /health, /metrics)
+APP_ROUTER = "app"
+
+
+@dataclass
+class RequestStats:
+    db_statements: int = 0
+    db_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: Engine):
+    """Count statements and DB time for the current request (async: pass engine.sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        starts = conn.info.get("query_start")
+        if stats is None or not starts:
+            return
+        stats.db_time += time.perf_counter() - starts.pop()
+        stats.db_statements += 1
+        stats.statements[statement] += 1
+
+
+def percentile(ordered, p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+
+class RouteHistogram:
+    """Rolling window of one route's recent requests plus lifetime totals."""
+
+    def __init__(self, window: int):
+        self.durations: Deque[float] = deque(maxlen=window)
+        self.db_times: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.n_plus_one = 0
+        self.duration_total = 0.0
+        self.db_time_total = 0.0
+        self.db_statements_total = 0
+
+    def observe(self, duration: float, stats: RequestStats, status_code: int, flagged: bool):
+        self.durations.append(duration)
+        self.db_times.append(stats.db_time)
+        self.count += 1
+        self.errors += int(status_code >= 500)
+        self.n_plus_one += int(flagged)
+        self.duration_total += duration
+        self.db_time_total += stats.db_time
+        self.db_statements_total += stats.db_statements
+
+    def snapshot(self) -> Dict[str, Any]:
+        durations = sorted(self.durations)
+        db_times = sorted(self.db_times)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "n_plus_one": self.n_plus_one,
+            "p50_ms": round(percentile(durations, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(durations, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(durations, 0.99) * 1000, 2),
+            "db_p95_ms": round(percentile(db_times, 0.95) * 1000, 2),
+            "avg_db_statements": round(self.db_statements_total / self.count, 2) if self.count else 0.0,
+        }
+
+
+class RequestMetrics:
+    """Per-route histograms, keyed by "METHOD /route/{template}"."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._routes: Dict[str, RouteHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, duration: float, stats: RequestStats, status_code: int, flagged: bool):
+        with self._lock:
+            histogram = self._routes.get(route)
+            if histogram is None:
+                histogram = self._routes[route] = RouteHistogram(self.window)
+            histogram.observe(duration, stats, status_code, flagged)
+
+    def histograms(self) -> Dict[str, RouteHistogram]:
+        with self._lock:
+            return dict(self._routes)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {route: histogram.snapshot() for route, histogram in sorted(self.histograms().items())}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+# Global request metrics
+request_metrics = RequestMetrics(window=settings.REQUEST_METRICS_WINDOW)
+
+
+def server_timing(duration: float, stats: RequestStats) -> str:
+    return (
+        f'app;dur={duration * 1000:.1f}, '
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.db_statements} statements"'
+    )
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware (streams pass through untouched; logged when they end)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        is_image = False
+        image_bytes = 0
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code, is_image, image_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                is_image = headers.get("content-type", "").startswith("image/")
+                # For streaming responses this covers the work before the first byte
+                headers.append(SERVER_TIMING_HEADER, server_timing(time.perf_counter() - start, stats))
+            elif message["type"] == "http.response.body" and is_image:
+                image_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._record(scope, time.perf_counter() - start, stats, status_code, image_bytes)
+
+    def _record(self, scope: Scope, duration: float, stats: RequestStats, status_code: int, image_bytes: int):
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+        if route is None:
+            router = UNMATCHED_ROUTE
+        else:
+            tags = getattr(route, "tags", None)
+            router = str(tags[0]) if tags else APP_ROUTER
+        key = f"{scope['method']} {route_path}"
+        flagged = stats.db_statements > settings.REQUEST_N_PLUS_ONE_THRESHOLD
+        request_metrics.observe(key, duration, stats, status_code, flagged)
+        observe_request(
+            router, scope["method"], route_path, status_code,
+            duration, stats.db_time, stats.db_statements, flagged
+        )
+        if image_bytes:
+            IMAGE_BYTES_SERVED.labels(router).inc(image_bytes)
+
+        if flagged:
+            statement, repeats = stats.statements.most_common(1)[0]
+            logger.warning(
+                "Possible N+1 on %s: %d statements, %dx %s",
+                key, stats.db_statements, repeats, " ".join(statement.split())[:120]
+            )
+        if settings.REQUEST_LOG_ENABLED and logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "event": "request",
+                "method": scope["method"],
+                "route": route_path,
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "db_statements": stats.db_statements,
+                "db_ms": round(stats.db_time * 1000, 2),
+                "n_plus_one": flagged,
+            }))
@@ -1,19 +1,50 @@
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 
 # JWT Bearer
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class CachedUser:
+    """Lightweight snapshot of an authenticated user, safe to share across requests."""
+    id: int
+    username: str
+    role: str
+    claims: dict = field(default_factory=dict, compare=False)
+
+
+# Token -> CachedUser, so repeated requests skip the JWT decode and user query
+auth_cache = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user_cache(user_id: int) -> int:
+    """Drop cached tokens for a user (call after a password or role change)."""
+    return auth_cache.delete_where(lambda cached: cached.id == user_id)
+
+
+def clear_auth_cache():
+    """Drop every cached token."""
+    auth_cache.clear()
+
+
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
     # Bcrypt requires bytes and has a 72-byte limit
@@ -55,12 +86,8 @@ def decode_access_token(token: str) -> dict:
         )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
-    token = credentials.credentials
+def _user_id_from_token(token: str) -> tuple[int, dict]:
+    """Decode a JWT into (user id, claims)."""
     payload = decode_access_token(token)
     user_id_str = payload.get("sub")
     
@@ -72,26 +99,84 @@ def get_current_user(
     
     # Convert string back to int
     try:
-        user_id = int(user_id_str)
+        return int(user_id_str), payload
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token",
         )
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    
+
+
+def _cache_user(token: str, user: Optional[User], payload: dict) -> CachedUser:
+    """Snapshot the user looked up for a token and cache it."""
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    return user
+    
+    snapshot = CachedUser(id=user.id, username=user.username, role=user.role, claims=payload)
+    # Never cache a token beyond its own expiry
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    auth_cache.set(token, snapshot, ttl=ttl)
+    return snapshot
+
+
+def resolve_user_from_token(token: str, db: Session) -> CachedUser:
+    """Resolve a JWT to a user snapshot, using the auth cache when possible."""
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached
+    
+    user_id, payload = _user_id_from_token(token)
+    user = db.query(User).filter(User.id == user_id).first()
+    return _cache_user(token, user, payload)
+
+
+async def resolve_user_from_token_async(token: str, db: AsyncSession) -> CachedUser:
+    """resolve_user_from_token() for an AsyncSession."""
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached
+    
+    user_id, payload = _user_id_from_token(token)
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    return _cache_user(token, user, payload)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> CachedUser:
+    """Get the current authenticated user."""
+    return resolve_user_from_token(credentials.credentials, db)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> CachedUser:
+    """get_current_user for async endpoints (no threadpool slot, no blocking IO)."""
+    return await resolve_user_from_token_async(credentials.credentials, db)
 
 
 def require_role(allowed_roles: list[str]):
     """Dependency to check if user has required role."""
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    def role_checker(current_user: CachedUser = Depends(get_current_user)) -> CachedUser:
+        if current_user.role not in allowed_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions",
+            )
+        return current_user
+    return role_checker
+
+
+def require_role_async(allowed_roles: list[str]):
+    """require_role for async endpoints."""
+    async def role_checker(current_user: CachedUser = Depends(get_current_user_async)) -> CachedUser:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -6,6 +6,7 @@ from app.models.message import Message
 from app.models.audit_log import AuditLog
 from app.core.security import hash_password
 from app.core.config import settings
+from app.services.counters import load_counters
 
 
 def init_db():
@@ -38,5 +39,8 @@ def init_db():
             print("✓ Created default users: admin and wangzw")
         else:
             print("✓ Users already exist, skipping initialization")
+        
+        # Warm the in-memory counters (bootstraps the stats table on first run)
+        load_counters(db)
     finally:
         db.close()
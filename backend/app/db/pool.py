@@ -0,0 +1,168 @@
+"""
+Connection pool configuration and checkout metrics for the sync and async engines.
+
+Pool size, overflow, timeout, recycle and the pre-ping strategy come from
+Settings. "idle" pre-ping only pings a connection that sat unused in the pool
+longer than DB_POOL_PING_IDLE_SECONDS, instead of a SELECT 1 on every
+checkout. File-based SQLite gets WAL, busy_timeout and synchronous=NORMAL
+on every new connection.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+PRE_PING_ALWAYS = "always"
+PRE_PING_IDLE = "idle"
+PRE_PING_NEVER = "never"
+
+# Checkout waits kept for the percentile estimate
+WAIT_SAMPLES = 1000
+
+
+class PoolMetrics:
+    """Checkout count, wait times and timeouts of one pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent = deque(maxlen=WAIT_SAMPLES)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._recent.append(seconds)
+
+    def timed_out(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, wait_total = self.checkouts, self.wait_total
+        p95 = recent[min(int(len(recent) * 0.95), len(recent) - 1)] if recent else 0.0
+        return {
+            "checkouts": checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+            "wait_ms_p95": round(p95 * 1000, 3),
+            "wait_ms_max": round(self.wait_max * 1000, 3),
+        }
+
+
+class TimedPoolMixin:
+    """Times _do_get(), i.e. waiting for a free slot plus opening overflow connections."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timed_out()
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return conn
+
+
+def _timed_pool_class(base: type, name: str) -> type:
+    # Metrics live on the class so they survive pool.recreate() (engine.dispose())
+    return type(name, (TimedPoolMixin, base), {"metrics": PoolMetrics()})
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    database = make_url(url).database
+    return database in (None, "", ":memory:") or database.startswith("file::memory:")
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine."""
+    options: Dict[str, Any] = {
+        "echo": False,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == PRE_PING_ALWAYS,
+    }
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    if is_sqlite and _is_sqlite_memory(url):
+        # One shared in-memory database: keep SQLAlchemy's default pool for it
+        return options
+    if is_sqlite and not is_async:
+        # Sessions move between threadpool threads
+        options["connect_args"] = {"check_same_thread": settings.SQLITE_CHECK_SAME_THREAD}
+
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    options.update(
+        poolclass=_timed_pool_class(base, "AsyncTimedQueuePool" if is_async else "TimedQueuePool"),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+def configure_engine(engine: Engine):
+    """Register the connect / checkout hooks (pass async_engine.sync_engine for async)."""
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                if not _is_sqlite_memory(str(engine.url)):
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                    cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            finally:
+                cursor.close()
+
+    if settings.DB_POOL_PRE_PING != PRE_PING_IDLE:
+        return
+
+    @event.listens_for(engine, "checkin")
+    def mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.pop("checked_in_at", None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < settings.DB_POOL_PING_IDLE_SECONDS:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError()
+        finally:
+            cursor.close()
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """In-use / idle / overflow counts plus checkout wait metrics of an engine's pool."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if not isinstance(pool, TimedPoolMixin):
+        stats["status"] = pool.status()
+        return stats
+    stats.update(
+        size=pool.size(),
+        max_overflow=pool._max_overflow,
+        in_use=pool.checkedout(),
+        idle=pool.checkedin(),
+        # QueuePool counts overflow from -pool_size upwards
+        overflow=max(pool.overflow(), 0),
+        **pool.metrics.snapshot(),
+    )
+    return stats
@@ -1,12 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
+from app.db.pool import configure_engine, engine_options
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False,
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+configure_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -18,3 +17,38 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def async_database_url(url: str) -> str:
+    """Map the sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)."""
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        # asyncpg spells libpq's sslmode as ssl
+        url = url.replace("sslmode=", "ssl=")
+    elif url.startswith("sqlite://"):
+        url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+class AsyncBridgeSession(Session):
+    """Sync Session class behind AsyncSessionLocal (target for session events)."""
+
+
+ASYNC_DATABASE_URL = async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+configure_engine(async_engine.sync_engine)
+
+# expire_on_commit=False: attribute access after commit must not trigger lazy IO
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=AsyncBridgeSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    """Async database session dependency (for async def endpoints)."""
+    async with AsyncSessionLocal() as db:
+        yield db
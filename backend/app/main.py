@@ -1,10 +1,28 @@
-from fastapi import FastAPI
+import hmac
+import logging
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
+from app.core.audit import audit_writer
+from app.core.metrics import RuntimeCollector, register_runtime_collector, registry
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.rate_limit import RATE_LIMIT_HEADERS
+from app.core.request_metrics import SERVER_TIMING_HEADER, RequestMetricsMiddleware, instrument_engine
 from app.db.init_db import init_db
-from app.routers import auth, todos, messages, external, pictures, admin, photos
+from app.db.session import async_engine, engine
+from app.services import thumbnails
+from app.services.picture import picture_catalog
+from app.services.external_api import external_client
+from app.services.external_cache import external_cache
+from app.services.health import STATUS_FAIL, health_checker
+from app.services.resilience import external_guard
+from app.routers import auth, todos, messages, external, pictures, admin, photos, media
+
+logging.basicConfig(level=settings.LOG_LEVEL.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 
 @asynccontextmanager
@@ -13,12 +31,25 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting application...")
     init_db()
+    audit_writer.start()
+    await external_client.start()
+    try:
+        picture_catalog.refresh(force=True)
+    except Exception as e:
+        print(f"⚠️  Picture catalog not loaded: {repr(e)}")
+    health_checker.mark_ready()
     print("✅ Application ready!")
     
     yield
     
     # Shutdown
     print("👋 Shutting down...")
+    health_checker.mark_stopping()
+    await external_client.stop()
+    external_cache.close()
+    audit_writer.stop()
+    thumbnails.shutdown()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -35,8 +66,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER, *RATE_LIMIT_HEADERS],
 )
 
+# Per-request timing and DB statement counts (outermost, so it times everything)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+app.add_middleware(RequestMetricsMiddleware)
+register_runtime_collector(RuntimeCollector(
+    engines={"sync": engine, "async": async_engine.sync_engine},
+    external_client=external_client,
+    external_guard=external_guard,
+    external_cache=external_cache,
+))
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(todos.router)
@@ -45,6 +88,7 @@ app.include_router(external.router)
 app.include_router(pictures.router)
 app.include_router(photos.router)
 app.include_router(admin.router)
+app.include_router(media.router)
 
 
 @app.get("/")
@@ -58,6 +102,30 @@ def root():
 
 
 @app.get("/health")
+@app.get("/health/live")
 def health():
-    """Health check endpoint."""
+    """Liveness: the process is up and serving (no dependency checks)."""
     return {"status": "healthy"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness: DB latency, Picture / uploads directories, free disk and the
+    external API circuit (cached briefly). 503 until startup has finished
+    or when a required dependency fails.
+    """
+    result = await health_checker.readiness()
+    if result["status"] == STATUS_FAIL:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=result)
+    return result
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus scrape endpoint (in-memory only, no DB queries)."""
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if settings.METRICS_TOKEN and not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    # Content-Type passed as a header: media_type would append a second charset
+    return Response(content=generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -3,3 +3,5 @@ from app.models.user import User
 from app.models.todo import Todo
 from app.models.message import Message
 from app.models.audit_log import AuditLog
+from app.models.stat import Stat
+from app.models.rate_limit import RateLimitState
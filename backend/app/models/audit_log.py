@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Index
 from datetime import datetime
 from app.db.base import Base
 
@@ -13,3 +13,8 @@ class AuditLog(Base):
     resource_id = Column(String(200), nullable=True)  # todo_id, message_id, filename, etc.
     meta_json = Column(JSON, nullable=True)  # Additional metadata
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+    )
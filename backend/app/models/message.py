@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from datetime import datetime
 from app.db.base import Base
 
@@ -12,3 +12,8 @@ class Message(Base):
     content = Column(Text, nullable=False)
     read_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_messages_created_at_id", "created_at", "id"),
+    )
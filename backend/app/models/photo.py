@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from datetime import datetime
 from app.db.base import Base
 import enum
@@ -13,8 +13,14 @@ class Photo(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String(255), nullable=False, unique=True)
+    content_hash = Column(String(64), nullable=True, unique=True, index=True)  # SHA-256 of the file bytes
     uploader_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(String(20), default=PhotoStatus.PENDING, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     reviewed_at = Column(DateTime, nullable=True)
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    
+    __table_args__ = (
+        # Keyset pagination order within a status
+        Index("ix_photos_status_created_at_id", "status", "created_at", "id"),
+    )
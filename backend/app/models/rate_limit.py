@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Float, String
+from app.db.base import Base
+
+
+class RateLimitState(Base):
+    __tablename__ = "rate_limits"
+    
+    key = Column(String(100), primary_key=True)  # external:2, ...
+    tat = Column(Float, nullable=False)  # GCRA theoretical arrival time (unix seconds)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from app.db.base import Base
+
+
+class Stat(Base):
+    __tablename__ = "stats"
+    
+    key = Column(String(100), primary_key=True)  # message_total, unread:2, todo_open:2, etc.
+    value = Column(Integer, default=0, nullable=False)
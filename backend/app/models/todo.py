@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from datetime import datetime
 from app.db.base import Base
 
@@ -12,3 +12,8 @@ class Todo(Base):
     done = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Keyset pagination order within an owner's list
+        Index("ix_todos_owner_created_at_id", "owner_id", "created_at", "id"),
+    )
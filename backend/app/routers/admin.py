@@ -1,16 +1,23 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
+from sqlalchemy import and_
+from datetime import datetime
 
-from app.db.session import get_db
+from app.db.pool import pool_stats
+from app.db.session import async_engine, engine, get_db
 from app.models.user import User
 from app.models.todo import Todo
 from app.models.message import Message
 from app.models.audit_log import AuditLog
 from app.core.security import require_role
 from app.core.audit import log_action
+from app.core.pagination import paginate, set_next_cursor
+from app.core.request_metrics import request_metrics
+from app.core.media_signing import PHOTO, media_urls
+from app.services import counters, thumbnails
+from app.services.blob_store import UPLOAD_DIR
+from app.services.dashboard import get_overview_stats, invalidate_overview
 from app.schemas.todo import TodoResponse
 from app.schemas.message import MessageResponse
 from app.schemas.audit_log import AuditLogResponse
@@ -26,84 +33,43 @@ def get_overview(
     current_user: User = Depends(require_role(["ADMIN"]))
 ):
     """Get overview dashboard statistics (admin only)."""
-    # Get friend user
-    friend = db.query(User).filter(User.username == "wangzw").first()
-    if not friend:
-        raise HTTPException(status_code=404, detail="Friend user not found")
-    
-    # Todo stats
-    todo_total = db.query(Todo).filter(Todo.owner_id == friend.id).count()
-    todo_open = db.query(Todo).filter(
-        and_(Todo.owner_id == friend.id, Todo.done == False)
-    ).count()
-    
-    # Message stats
-    message_total = db.query(Message).count()
-    
-    # External API call stats
-    today = datetime.utcnow().date()
-    last_7d = datetime.utcnow() - timedelta(days=7)
-    
-    external_call_today = db.query(AuditLog).filter(
-        and_(
-            AuditLog.user_id == friend.id,
-            AuditLog.action == "EXTERNAL_CALL",
-            func.date(AuditLog.created_at) == today
-        )
-    ).count()
-    
-    external_call_last_7d = db.query(AuditLog).filter(
-        and_(
-            AuditLog.user_id == friend.id,
-            AuditLog.action == "EXTERNAL_CALL",
-            AuditLog.created_at >= last_7d
-        )
-    ).count()
-    
-    # Photo stats (Pending)
-    pending_photos = db.query(Photo).filter(Photo.status == PhotoStatus.PENDING).count()
-    
-    # Last actions (Exclude PICTURE_VIEW)
-    last_actions = db.query(AuditLog).filter(
-        and_(
-            AuditLog.user_id == friend.id,
-            AuditLog.action != "PICTURE_VIEW"
-        )
-    ).order_by(AuditLog.created_at.desc()).limit(10).all()
-    
-    last_actions_data = []
-    for log in last_actions:
-        last_actions_data.append({
-            "id": log.id,
-            "action": log.action,
-            "resource_type": log.resource_type,
-            "created_at": log.created_at.isoformat()
-        })
-    
+    return get_overview_stats(db)
+
+
+@router.get("/db/pool")
+def get_db_pool_stats(
+    current_user: User = Depends(require_role(["ADMIN"]))
+):
+    """Connection pool usage and checkout wait times of both engines (admin only)."""
     return {
-        "todo_total": todo_total,
-        "todo_open": todo_open,
-        "message_total": message_total,
-        "external_call_today": external_call_today,
-        "external_call_last_7d": external_call_last_7d,
-        "pending_photos": pending_photos,
-        "last_actions": last_actions_data
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine),
     }
 
 
+@router.get("/metrics/requests")
+def get_request_metrics(
+    current_user: User = Depends(require_role(["ADMIN"]))
+):
+    """Rolling per-route latency percentiles, DB time and N+1 flags (admin only)."""
+    return request_metrics.snapshot()
+
+
 @router.get("/audit", response_model=List[AuditLogResponse])
 def get_audit_logs(
+    response: Response,
     action: Optional[str] = Query(None, description="Filter by action"),
     exclude_actions: Optional[str] = Query("PICTURE_VIEW", description="Comma separated actions to exclude"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     limit: int = Query(100, ge=1, le=500),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN"]))
 ):
     """Get audit logs with optional filters (admin only)."""
-    query = db.query(AuditLog)
+    # Join username in the same query instead of one lookup per row
+    query = db.query(AuditLog, User.username).outerjoin(User, User.id == AuditLog.user_id)
     
     # Apply filters
     if action:
@@ -127,14 +93,13 @@ def get_audit_logs(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid end_date format")
     
-    logs = query.order_by(AuditLog.created_at.desc()).limit(limit).offset(offset).all()
+    rows, next_cursor = paginate(query, AuditLog, limit, cursor)
+    set_next_cursor(response, next_cursor)
     
-    # Add username to each log
     result = []
-    for log in logs:
-        user = db.query(User).filter(User.id == log.user_id).first()
+    for log, username in rows:
         log_response = AuditLogResponse.from_orm(log)
-        log_response.username = user.username if user else "Unknown"
+        log_response.username = username or "Unknown"
         result.append(log_response)
     
     return result
@@ -153,7 +118,8 @@ def list_pending_photos(
             "id": p.id,
             "filename": p.filename,
             "created_at": p.created_at,
-            "uploader_id": p.uploader_id
+            "uploader_id": p.uploader_id,
+            "urls": media_urls(PHOTO, p.filename, current_user.id)
         }
         for p in photos
     ]
@@ -169,10 +135,16 @@ def approve_photo(
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
         
+    if photo.status == PhotoStatus.PENDING:
+        counters.increment(db, counters.PHOTO_PENDING, -1)
     photo.status = PhotoStatus.APPROVED
     photo.reviewed_at = datetime.utcnow()
     photo.reviewed_by = current_user.id
     db.commit()
+    invalidate_overview()
+    
+    # Pre-render gallery variants off the request path
+    thumbnails.schedule_variants(UPLOAD_DIR / photo.filename)
     
     log_action(db, current_user.id, "PHOTO_APPROVE", "PHOTO", str(photo.id))
     return {"status": "success"}
@@ -188,10 +160,13 @@ def reject_photo(
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
         
+    if photo.status == PhotoStatus.PENDING:
+        counters.increment(db, counters.PHOTO_PENDING, -1)
     photo.status = PhotoStatus.REJECTED
     photo.reviewed_at = datetime.utcnow()
     photo.reviewed_by = current_user.id
     db.commit()
+    invalidate_overview()
     
     log_action(db, current_user.id, "PHOTO_REJECT", "PHOTO", str(photo.id))
     return {"status": "success"}
@@ -200,6 +175,9 @@ def reject_photo(
 
 @router.get("/friend/todos", response_model=List[TodoResponse])
 def get_friend_todos(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN"]))
 ):
@@ -208,9 +186,9 @@ def get_friend_todos(
     if not friend:
         raise HTTPException(status_code=404, detail="Friend user not found")
     
-    todos = db.query(Todo).filter(
-        Todo.owner_id == friend.id
-    ).order_by(Todo.created_at.desc()).all()
+    query = db.query(Todo).filter(Todo.owner_id == friend.id)
+    todos, next_cursor = paginate(query, Todo, limit, cursor)
+    set_next_cursor(response, next_cursor)
     
     return todos
 
@@ -247,25 +225,35 @@ def delete_friend_todo(
     )
     
     db.delete(todo)
+    counters.increment(db, counters.todo_total_key(todo.owner_id), -1)
+    if not todo.done:
+        counters.increment(db, counters.todo_open_key(todo.owner_id), -1)
     db.commit()
+    invalidate_overview()
     
     return None
 
 
 @router.get("/friend/messages", response_model=List[MessageResponse])
 def get_friend_messages(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["ADMIN"]))
 ):
     """Get all messages (admin view with sender info)."""
-    messages = db.query(Message).order_by(Message.created_at.desc()).all()
+    # Join sender username in the same query instead of one lookup per row
+    query = db.query(Message, User.username).outerjoin(
+        User, User.id == Message.sender_id
+    )
+    rows, next_cursor = paginate(query, Message, limit, cursor)
+    set_next_cursor(response, next_cursor)
     
-    # Add sender username
     result = []
-    for msg in messages:
-        sender = db.query(User).filter(User.id == msg.sender_id).first()
+    for msg, sender_username in rows:
         msg_response = MessageResponse.from_orm(msg)
-        msg_response.sender_username = sender.username if sender else "Unknown"
+        msg_response.sender_username = sender_username or "Unknown"
         result.append(msg_response)
     
     return result
@@ -1,22 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
-from app.core.security import verify_password, create_access_token, get_current_user
-from app.core.audit import log_action
+from app.core.security import verify_password, create_access_token, get_current_user_async
+from app.core.audit import log_action_async
 from app.schemas.auth import LoginRequest, LoginResponse, UserInfo
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login endpoint - only admin and friend can login."""
     # Find user
-    user = db.query(User).filter(User.username == request.username).first()
+    user = (await db.execute(select(User).where(User.username == request.username))).scalar_one_or_none()
     
-    if not user or not verify_password(request.password, user.hashed_password):
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not user or not await run_in_threadpool(verify_password, request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -26,7 +29,7 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
     access_token = create_access_token(data={"sub": str(user.id), "role": user.role})
     
     # Log login action
-    log_action(
+    await log_action_async(
         db=db,
         user_id=user.id,
         action="LOGIN",
@@ -43,7 +46,7 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserInfo)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user_async)):
     """Get current user information."""
     return UserInfo(
         id=current_user.id,
@@ -1,37 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 
-from app.db.session import get_db
+from app.db.session import get_async_db, AsyncSessionLocal
 from app.models.user import User
-from app.core.security import get_current_user
-from app.core.audit import log_action
-from app.core.rate_limit import rate_limiter
+from app.core.security import get_current_user_async, require_role_async
+from app.core.audit import log_action_async
+from app.core.metrics import observe_external_call
+from app.core.rate_limit import RateLimitResult, rate_limiter
 from app.schemas.external import ExternalApiRequest, ExternalApiResponse
-from app.services.external_api import call_external_api, extract_text_from_response
+from app.services.events import format_sse
+from app.services.external_cache import CACHE_BYPASS, CACHE_HIT, CACHE_MISS, external_cache
+from app.services.resilience import CIRCUIT_OPEN, ExternalUnavailableError, external_guard
+from app.services.external_api import (
+    call_external_api, external_client, extract_text_from_response, iter_stream_text, open_external_stream
+)
 
 router = APIRouter(prefix="/external", tags=["external"])
 
 
+def upstream_error(e: Exception, limit: RateLimitResult) -> HTTPException:
+    """
+    503 + Retry-After when the guard refused the call, 502 for upstream failures.
+    Both keep the RateLimit-* headers of the check that let the request through.
+    """
+    headers = limit.headers()
+    if isinstance(e, ExternalUnavailableError):
+        headers["Retry-After"] = str(max(int(e.retry_after), 1))
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"External API unavailable: {str(e)}",
+            headers=headers
+        )
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail=f"External API call failed: {str(e)}",
+        headers=headers
+    )
+
+
 @router.post("/call", response_model=ExternalApiResponse)
 async def call_external(
     request: ExternalApiRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Call external paid API with HARDCODED parameters.
     Only the prompt is provided by the user.
-    Rate limited to 20 requests per minute per user.
+    Rate limited to RATE_LIMIT_PER_MINUTE requests per minute per user.
     """
-    # Check rate limit
-    rate_limiter.check_rate_limit(current_user.id)
+    # Check rate limit (may hit the shared DB backend, so off the event loop)
+    limit = await run_in_threadpool(rate_limiter.check_rate_limit, current_user.id, response)
     
     start_time = datetime.utcnow()
     
     try:
-        # Call external API
-        raw_response = await call_external_api(request.prompt)
+        # Call external API (served from the cache / shared with identical in-flight prompts)
+        raw_response, cache_status = await external_cache.get_or_fetch(
+            request.prompt, lambda: call_external_api(request.prompt)
+        )
         
         # Extract text
         text = extract_text_from_response(raw_response)
@@ -41,18 +75,22 @@ async def call_external(
         latency_ms = int((end_time - start_time).total_seconds() * 1000)
         
         # Log action (without sensitive data)
-        log_action(
+        meta = {
+            "latency_ms": latency_ms,
+            "status": "success",
+            "prompt_length": len(request.prompt),
+            "response_length": len(text),
+            "cache": cache_status,
+            "cache_hit_rate": external_cache.hit_rate()
+        }
+        observe_external_call(meta)
+        await log_action_async(
             db=db,
             user_id=current_user.id,
             action="EXTERNAL_CALL",
             resource_type="external",
             resource_id=None,
-            meta_json={
-                "latency_ms": latency_ms,
-                "status": "success",
-                "prompt_length": len(request.prompt),
-                "response_length": len(text)
-            }
+            meta_json=meta
         )
         
         return ExternalApiResponse(
@@ -65,20 +103,191 @@ async def call_external(
         end_time = datetime.utcnow()
         latency_ms = int((end_time - start_time).total_seconds() * 1000)
         
-        log_action(
+        meta = {
+            "latency_ms": latency_ms,
+            "status": "rejected" if isinstance(e, ExternalUnavailableError) else "error",
+            "error_type": type(e).__name__
+        }
+        observe_external_call(meta)
+        await log_action_async(
             db=db,
             user_id=current_user.id,
             action="EXTERNAL_CALL",
             resource_type="external",
             resource_id=None,
-            meta_json={
-                "latency_ms": latency_ms,
-                "status": "error",
-                "error_type": type(e).__name__
-            }
+            meta_json=meta
         )
         
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"External API call failed: {str(e)}"
+        raise upstream_error(e, limit)
+
+
+async def _log_stream(user_id: int, meta: dict):
+    """Audit a finished stream; the request session is already closed by then."""
+    observe_external_call(meta)
+    try:
+        async with AsyncSessionLocal() as db:
+            await log_action_async(
+                db=db,
+                user_id=user_id,
+                action="EXTERNAL_CALL",
+                resource_type="external",
+                resource_id=None,
+                meta_json=meta
+            )
+    except Exception as e:
+        print(f"Logging error (non-fatal): {repr(e)}")
+
+
+async def _replay_cached(raw: dict, user_id: int, start: float, base_meta: dict):
+    """Send a cached completion as a single delta."""
+    text = extract_text_from_response(raw)
+    latency_ms = int((time.perf_counter() - start) * 1000)
+    yield format_sse("delta", {"text": text})
+    yield format_sse("done", {"ttft_ms": latency_ms, "latency_ms": latency_ms, "response_length": len(text)})
+    await _log_stream(user_id, {
+        **base_meta,
+        "ttft_ms": latency_ms,
+        "latency_ms": latency_ms,
+        "response_length": len(text),
+        "chunks": 1,
+        "status": "success",
+        "cache": CACHE_HIT,
+        "cache_hit_rate": external_cache.hit_rate()
+    })
+
+
+@router.post("/call/stream")
+async def call_external_stream(
+    request: ExternalApiRequest,
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Streaming variant of /external/call: forwards the upstream completion as
+    Server-Sent Events (`delta` frames with text, then `done` or `error`).
+    Same hardcoded parameters and rate limit as /external/call.
+    """
+    limit = await run_in_threadpool(rate_limiter.check_rate_limit, current_user.id)
+    stream_headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **limit.headers()}
+    
+    user_id = current_user.id
+    start = time.perf_counter()
+    base_meta = {"stream": True, "prompt_length": len(request.prompt)}
+    
+    cached = await external_cache.lookup(request.prompt)
+    if cached is not None:
+        return StreamingResponse(
+            _replay_cached(cached, user_id, start, base_meta),
+            media_type="text/event-stream",
+            headers=stream_headers
         )
+    
+    # Connect before answering so upstream failures still surface as 502 / 503.
+    # The in-flight slot is held until the stream ends; streams are not retried.
+    stack = AsyncExitStack()
+    try:
+        await stack.enter_async_context(external_guard.slot())
+        try:
+            upstream = await stack.enter_async_context(open_external_stream(request.prompt))
+            upstream.raise_for_status()
+        except Exception as e:
+            external_guard.record(e)
+            raise
+        external_guard.record(None)
+    except Exception as e:
+        await stack.aclose()
+        await _log_stream(user_id, {
+            **base_meta,
+            "latency_ms": int((time.perf_counter() - start) * 1000),
+            "status": "rejected" if isinstance(e, ExternalUnavailableError) else "error",
+            "error_type": type(e).__name__
+        })
+        raise upstream_error(e, limit)
+    
+    async def event_stream():
+        ttft_ms = None
+        parts = []
+        response_length = 0
+        chunks = 0
+        outcome = "success"
+        error_type = None
+        try:
+            async for text in iter_stream_text(upstream):
+                if ttft_ms is None:
+                    ttft_ms = int((time.perf_counter() - start) * 1000)
+                parts.append(text)
+                response_length += len(text)
+                chunks += 1
+                yield format_sse("delta", {"text": text})
+            yield format_sse("done", {
+                "ttft_ms": ttft_ms,
+                "latency_ms": int((time.perf_counter() - start) * 1000),
+                "response_length": response_length
+            })
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away mid-stream
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "error"
+            error_type = type(e).__name__
+            external_guard.record(e)
+            yield format_sse("error", {"detail": f"External API stream failed: {str(e)}"})
+        finally:
+            await stack.aclose()
+            if outcome == "success":
+                # Outside the upstream try: a cache failure (logged by store()) must not
+                # count against the circuit breaker or the stream's outcome.
+                # Non-streaming response shape, so /external/call can reuse it
+                await external_cache.store(
+                    request.prompt, {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}]}
+                )
+            meta = {
+                **base_meta,
+                "ttft_ms": ttft_ms,
+                "latency_ms": int((time.perf_counter() - start) * 1000),
+                "response_length": response_length,
+                "chunks": chunks,
+                "status": outcome,
+                "cache": CACHE_MISS if external_cache.enabled else CACHE_BYPASS,
+                "cache_hit_rate": external_cache.hit_rate()
+            }
+            if error_type:
+                meta["error_type"] = error_type
+            await _log_stream(user_id, meta)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=stream_headers
+    )
+
+
+@router.get("/health")
+def get_external_health():
+    """
+    Circuit breaker state of the external API client (unauthenticated, so
+    state only; the counters are on /metrics). Returns 503 while the circuit
+    is open so monitors can alert on it.
+    """
+    circuit = external_guard.breaker.stats()
+    content = {"circuit": circuit["state"]}
+    if circuit["state"] == CIRCUIT_OPEN:
+        content["retry_after_seconds"] = circuit["retry_after_seconds"]
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=content)
+    return content
+
+
+@router.get("/pool")
+async def get_pool_stats(
+    current_user: User = Depends(require_role_async(["ADMIN"]))
+):
+    """Connection pool utilization of the shared external API client (admin only)."""
+    return external_client.stats()
+
+
+@router.get("/cache")
+async def get_cache_stats(
+    current_user: User = Depends(require_role_async(["ADMIN"]))
+):
+    """Response cache size and hit rate (admin only)."""
+    return external_cache.stats()
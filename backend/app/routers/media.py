@@ -0,0 +1,75 @@
+import mimetypes
+import re
+import time
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.core.audit import audit_writer, log_action
+from app.core.http_cache import cached_file_response, file_etag, variant_etag
+from app.core import media_signing
+from app.services import thumbnails
+from app.services.blob_store import UPLOAD_DIR
+from app.services.picture import get_picture_path
+
+router = APIRouter(prefix=media_signing.MEDIA_PREFIX, tags=["media"])
+
+_CONTENT_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@router.get("/{kind}/{name}/{size}")
+def get_media(
+    kind: str,
+    name: str,
+    size: str,
+    request: Request,
+    uid: int = Query(...),
+    exp: int = Query(...),
+    sig: str = Query(...)
+):
+    """
+    Serve a photo or picture through a signed URL issued by a list endpoint.
+    Authorization was done when the URL was issued, so this only checks the
+    signature and expiry and opens the file: no token decode, no DB query.
+    """
+    if kind not in media_signing.MEDIA_KINDS or size not in [thumbnails.ORIGINAL, *thumbnails.VARIANTS]:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not media_signing.verify(kind, name, size, uid, exp, sig):
+        raise HTTPException(status_code=403, detail="Invalid or expired media URL")
+    
+    if kind == media_signing.PHOTO:
+        file_path = UPLOAD_DIR / name
+        if "/" in name or "\\" in name or not file_path.is_file():
+            raise HTTPException(status_code=404, detail="Photo not found")
+        # Content-addressed blobs are named after their SHA-256
+        stem = file_path.stem
+        etag = f'"{stem}"' if _CONTENT_HASH_RE.match(stem) else file_etag(file_path)
+    else:
+        file_path = get_picture_path(name)
+        etag = file_etag(file_path)
+        # Only logged through the background writer queue; no DB round-trip here
+        if audit_writer.running:
+            log_action(
+                db=None,
+                user_id=uid,
+                action="PICTURE_VIEW",
+                resource_type="picture",
+                resource_id=name,
+                meta_json={"size": file_path.stat().st_size, "via": "signed_url"}
+            )
+    
+    # The URL stops working at exp, so it must not outlive it in any cache
+    cache_control = f"private, max-age={max(exp - int(time.time()), 0)}"
+    
+    variant = thumbnails.resolve_variant(file_path, size)
+    if variant is not None:
+        return cached_file_response(
+            request,
+            variant,
+            media_type=thumbnails.VARIANT_MEDIA_TYPE,
+            etag=variant_etag(etag, size),
+            cache_control=cache_control,
+            filename=file_path.stem + thumbnails.VARIANT_EXTENSION
+        )
+    content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    return cached_file_response(
+        request, file_path, media_type=content_type, etag=etag, cache_control=cache_control, filename=file_path.name
+    )
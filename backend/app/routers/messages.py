@@ -1,89 +1,152 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
-from app.db.session import get_db
+from app.db.session import get_async_db, AsyncSessionLocal
 from app.models.user import User
 from app.models.message import Message
-from app.core.security import get_current_user
-from app.core.audit import log_action
+from app.core.config import settings
+from app.core.security import get_current_user_async, resolve_user_from_token_async
+from app.core.audit import log_action_async
+from app.core.pagination import paginate_async, set_next_cursor
+from app.services import counters
+from app.services.dashboard import invalidate_overview
+from app.services.events import broker, format_sse
 from app.schemas.message import MessageCreate, MessageResponse
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
 
+def publish_unread(user_id: int):
+    """Push the current unread count to a user's open streams."""
+    broker.publish(
+        "unread",
+        {"unread": counters.get_counter(counters.unread_key(user_id))},
+        user_ids=[user_id],
+    )
+
+
 @router.get("", response_model=List[MessageResponse])
-def list_messages(
+async def list_messages(
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """List all messages (admin and friend can see all messages)."""
-    messages = db.query(Message).order_by(
-        Message.created_at.desc()
-    ).limit(limit).offset(offset).all()
+    # Join sender username in the same query instead of one lookup per row
+    stmt = select(Message, User.username).outerjoin(
+        User, User.id == Message.sender_id
+    )
+    rows, next_cursor = await paginate_async(db, stmt, Message, limit, cursor)
+    set_next_cursor(response, next_cursor)
     
-    # Add sender username to each message
     result = []
-    for msg in messages:
-        sender = db.query(User).filter(User.id == msg.sender_id).first()
+    for msg, sender_username in rows:
         msg_response = MessageResponse.from_orm(msg)
-        msg_response.sender_username = sender.username if sender else "Unknown"
+        msg_response.sender_username = sender_username or "Unknown"
         result.append(msg_response)
     
     return result
 
 
 @router.get("/unread_count")
-def get_unread_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_unread_count(
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get count of unread messages for current user."""
-    count = db.query(Message).filter(
-        Message.receiver_id == current_user.id,
-        Message.read_at == None
-    ).count()
-    return {"unread": count}
+    return {"unread": counters.get_counter(counters.unread_key(current_user.id))}
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    token: str = Query(..., description="Access token (EventSource cannot send headers)"),
+):
+    """
+    Server-Sent Events stream of message_created, message_deleted,
+    messages_read and unread events for the current user.
+    """
+    if token.startswith("Bearer "):
+        token = token.split(" ")[1]
+    # Short-lived session: the stream must not hold a DB connection open
+    async with AsyncSessionLocal() as db:
+        current_user = await resolve_user_from_token_async(token, db)
+    
+    async def event_stream():
+        subscriber = broker.subscribe(current_user.id)
+        try:
+            yield "retry: 3000\n\n"
+            yield format_sse("unread", {"unread": counters.get_counter(counters.unread_key(current_user.id))})
+            while not subscriber.dropped:
+                if await request.is_disconnected():
+                    break
+                try:
+                    frame = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Heartbeat comment keeps proxies from closing an idle stream
+                    yield ": ping\n\n"
+                    continue
+                yield frame
+        finally:
+            broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/mark_read")
-def mark_messages_read(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def mark_messages_read(
+    up_to_id: Optional[int] = Query(None, description="Only mark messages with id <= up_to_id"),
+    before: Optional[datetime] = Query(None, description="Only mark messages created at or before this time"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Mark all unread messages for current user as read."""
-    unread_messages = db.query(Message).filter(
+    """Mark unread messages for current user as read (optionally only a visible window)."""
+    # Single set-based UPDATE instead of loading every unread message
+    stmt = update(Message).where(
         Message.receiver_id == current_user.id,
         Message.read_at == None
-    ).all()
+    )
+    if up_to_id is not None:
+        stmt = stmt.where(Message.id <= up_to_id)
+    if before is not None:
+        stmt = stmt.where(Message.created_at <= before)
+    stmt = stmt.values(read_at=datetime.utcnow()).execution_options(synchronize_session=False)
     
-    for msg in unread_messages:
-        msg.read_at = datetime.utcnow()
+    marked_ids = (await db.execute(stmt.returning(Message.id))).scalars().all()
     
-    db.commit()
-    return {"status": "success", "marked_count": len(unread_messages)}
+    await counters.increment_async(db, counters.unread_key(current_user.id), -len(marked_ids))
+    await db.commit()
+    if marked_ids:
+        broker.publish("messages_read", {"ids": marked_ids}, user_ids=[current_user.id])
+        publish_unread(current_user.id)
+    return {"status": "success", "marked_count": len(marked_ids)}
 
 
 @router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-def create_message(
+async def create_message(
     message: MessageCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Create a new message (admin and friend)."""
     # Determine receiver
-    receiver_id = None
-    if current_user.role == "ADMIN":
-        friend = db.query(User).filter(User.role == "FRIEND").first()
-        if friend:
-            receiver_id = friend.id
-    else:
-        admin = db.query(User).filter(User.role == "ADMIN").first()
-        if admin:
-            receiver_id = admin.id
+    receiver_role = "FRIEND" if current_user.role == "ADMIN" else "ADMIN"
+    receiver_id = (await db.execute(
+        select(User.id).where(User.role == receiver_role).limit(1)
+    )).scalar_one_or_none()
 
     new_message = Message(
         sender_id=current_user.id,
@@ -91,11 +154,15 @@ def create_message(
         content=message.content
     )
     db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
+    await db.flush()
+    await counters.increment_async(db, counters.MESSAGE_TOTAL)
+    if receiver_id is not None:
+        await counters.increment_async(db, counters.unread_key(receiver_id))
+    await db.commit()
+    invalidate_overview()
     
     # Log action
-    log_action(
+    await log_action_async(
         db=db,
         user_id=current_user.id,
         action="MESSAGE_CREATE",
@@ -108,17 +175,21 @@ def create_message(
     msg_response = MessageResponse.from_orm(new_message)
     msg_response.sender_username = current_user.username
     
+    broker.publish("message_created", msg_response.model_dump(mode="json"))
+    if receiver_id is not None:
+        publish_unread(receiver_id)
+    
     return msg_response
 
 
 @router.delete("/{message_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_message(
+async def delete_message(
     message_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Delete a message. Friend can only delete own messages, admin can delete any."""
-    message = db.query(Message).filter(Message.id == message_id).first()
+    message = await db.get(Message, message_id)
     
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
@@ -131,7 +202,7 @@ def delete_message(
         )
     
     # Log action
-    log_action(
+    await log_action_async(
         db=db,
         user_id=current_user.id,
         action="MESSAGE_DELETE",
@@ -143,7 +214,16 @@ def delete_message(
         }
     )
     
-    db.delete(message)
-    db.commit()
+    was_unread = message.receiver_id is not None and message.read_at is None
+    await db.delete(message)
+    await counters.increment_async(db, counters.MESSAGE_TOTAL, -1)
+    if was_unread:
+        await counters.increment_async(db, counters.unread_key(message.receiver_id), -1)
+    await db.commit()
+    invalidate_overview()
+    
+    broker.publish("message_deleted", {"id": message_id})
+    if was_unread:
+        publish_unread(message.receiver_id)
     
     return None
@@ -1,102 +1,160 @@
+import mimetypes
 import os
-import shutil
-import uuid
-from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 from app.models.photo import Photo, PhotoStatus
-from app.core.security import get_current_user, require_role
-from app.core.audit import log_action
+from app.core.security import get_current_user_async, require_role_async
+from app.core.audit import log_action_async
+from app.core.http_cache import (
+    CACHE_IMMUTABLE, CACHE_NO_STORE, cached_file_response, file_etag, variant_etag
+)
+from app.core.pagination import paginate_async, set_next_cursor
+from app.core.media_signing import PHOTO, media_urls
+from app.services import counters
+from app.services.dashboard import invalidate_overview
+from app.services import thumbnails
+from app.services.blob_store import UPLOAD_DIR, blob_name
+from app.services.upload import receive_file
 
 router = APIRouter(prefix="/photos", tags=["photos"])
 
-UPLOAD_DIR = Path("uploads")
-if not UPLOAD_DIR.exists():
-    # Fallback for different CWD
-    UPLOAD_DIR = Path("backend/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 MAX_FILE_SIZE = 8 * 1024 * 1024  # 8MB
 
-@router.post("/upload", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/upload",
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
 async def upload_photo(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["FRIEND"]))
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async(["FRIEND"]))
 ):
-    """Upload a photo (Friend only)."""
-    # Validate extension
-    ext = Path(file.filename).suffix.lower()
-    if ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(status_code=400, detail="Invalid file type. Only jpg, jpeg, png, webp allowed.")
+    """
+    Upload a photo (Friend only). The body is streamed, not spooled.
+    Files are stored by content hash; re-uploading identical bytes returns
+    the existing record (200) without writing anything.
+    """
+    received = await receive_file(request, UPLOAD_DIR, MAX_FILE_SIZE, ALLOWED_EXTENSIONS)
     
-    # Validate size (approximate, as we read chunks)
-    # For strict size limit, we'd need to read and count, or rely on content-length header (unreliable)
-    # Here we'll just read and save, checking size after? Or during?
-    # Simple check:
-    file.file.seek(0, 2)
-    size = file.file.tell()
-    file.file.seek(0)
-    
-    if size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large. Max 8MB.")
-
-    # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    random_str = str(uuid.uuid4())[:8]
-    filename = f"{timestamp}_{random_str}{ext}"
-    file_path = UPLOAD_DIR / filename
+    by_hash = select(Photo).where(Photo.content_hash == received.sha256)
+    existing = (await db.execute(by_hash)).scalar_one_or_none()
+    if existing:
+        received.discard()
+        response.status_code = status.HTTP_200_OK
+        return {"id": existing.id, "status": existing.status, "filename": existing.filename, "duplicate": True}
     
-    # Save file
+    filename = blob_name(received.sha256, received.extension)
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        if (UPLOAD_DIR / filename).exists():
+            received.discard()
+        else:
+            received.move_to(UPLOAD_DIR / filename)
     except Exception as e:
+        received.discard()
         raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
         
     # Create DB record
     new_photo = Photo(
         filename=filename,
+        content_hash=received.sha256,
         uploader_id=current_user.id,
         status=PhotoStatus.PENDING
     )
     db.add(new_photo)
-    db.commit()
-    db.refresh(new_photo)
+    try:
+        await db.flush()
+        await counters.increment_async(db, counters.PHOTO_PENDING)
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same bytes won the race
+        await db.rollback()
+        existing = (await db.execute(by_hash)).scalar_one_or_none()
+        if not existing:
+            raise
+        response.status_code = status.HTTP_200_OK
+        return {"id": existing.id, "status": existing.status, "filename": existing.filename, "duplicate": True}
+    invalidate_overview()
     
-    log_action(db, current_user.id, "PHOTO_UPLOAD", "PHOTO", str(new_photo.id))
+    await log_action_async(
+        db, current_user.id, "PHOTO_UPLOAD", "PHOTO", str(new_photo.id),
+        meta_json={"size": received.size, "sha256": received.sha256}
+    )
     
     return {"id": new_photo.id, "status": new_photo.status, "filename": new_photo.filename}
 
 @router.get("", response_model=List[dict])
-def list_photos(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def list_photos(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """List approved photos (Friend/Admin)."""
-    photos = db.query(Photo).filter(Photo.status == PhotoStatus.APPROVED).order_by(Photo.created_at.desc()).all()
+    stmt = select(Photo).where(Photo.status == PhotoStatus.APPROVED)
+    photos, next_cursor = await paginate_async(db, stmt, Photo, limit, cursor)
+    set_next_cursor(response, next_cursor)
     
     return [
         {
             "id": p.id,
             "filename": p.filename,
-            "created_at": p.created_at
+            "created_at": p.created_at,
+            "urls": media_urls(PHOTO, p.filename, current_user.id)
         }
         for p in photos
     ]
 
+def photo_file_response(request: Request, photo: Photo, file_path: Path, size: str) -> Response:
+    """
+    Serve the requested variant (falling back to the original) with a content-hash
+    ETag. Approved photos are content-addressed, so they are cached as immutable.
+    """
+    etag = f'"{photo.content_hash}"' if photo.content_hash else file_etag(file_path)
+    cache_control = CACHE_IMMUTABLE if photo.status == PhotoStatus.APPROVED else CACHE_NO_STORE
+    
+    variant = thumbnails.resolve_variant(file_path, size)
+    if variant is not None:
+        return cached_file_response(
+            request, variant, thumbnails.VARIANT_MEDIA_TYPE, variant_etag(etag, size), cache_control
+        )
+    content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    return cached_file_response(request, file_path, content_type, etag, cache_control)
+
+
+# Stays a sync endpoint: its work is file IO (stat, hashing, variant rendering),
+# which belongs in the threadpool; gallery pages use signed /media URLs instead.
 @router.get("/{filename}")
 def get_photo(
     filename: str,
+    request: Request,
     token: Optional[str] = Query(None), # Allow token in query for img tags
+    size: str = Query(thumbnails.ORIGINAL, pattern=thumbnails.SIZE_PATTERN, description="original, medium or thumb"),
     db: Session = Depends(get_db),
     # We can't easily use Depends(get_current_user) here if it's an img tag without Authorization header
     # So we might need a custom dependency or just rely on the token param if provided, 
@@ -121,7 +179,7 @@ def get_photo(
     
     # For MVP, let's just serve if APPROVED. If not APPROVED, we need to check if user is ADMIN.
     if photo.status == PhotoStatus.APPROVED:
-        return FileResponse(file_path)
+        return photo_file_response(request, photo, file_path, size)
     
     # If not approved, we need to verify if user is admin.
     # This is tricky without a proper auth dependency that accepts query params.
@@ -145,7 +203,7 @@ def get_photo(
             pass
             
     if user_role == "ADMIN":
-        return FileResponse(file_path)
+        return photo_file_response(request, photo, file_path, size)
         
     raise HTTPException(status_code=403, detail="Photo not available")
 
@@ -2,16 +2,17 @@ from typing import List
 import mimetypes
 import os
 from urllib.parse import unquote
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.models.user import User
-from app.core.security import get_current_user, decode_access_token
+from app.core.security import CachedUser, get_current_user, resolve_user_from_token
 from app.core.audit import log_action
+from app.core.http_cache import CACHE_PRIVATE, cached_file_response, file_etag, variant_etag
 from app.schemas.picture import PictureInfo
-from app.services.picture import list_pictures, get_picture_path
+from app.services import thumbnails
+from app.services.picture import get_picture_path, picture_catalog
 
 router = APIRouter(prefix="/pictures", tags=["pictures"])
 
@@ -19,7 +20,7 @@ router = APIRouter(prefix="/pictures", tags=["pictures"])
 def get_current_user_from_query(
     token: str = Query(..., description="Access token for image authentication"),
     db: Session = Depends(get_db)
-) -> User:
+) -> CachedUser:
     """
     Authenticate user via query parameter token (for <img> tags).
     """
@@ -28,32 +29,7 @@ def get_current_user_from_query(
         if token.startswith("Bearer "):
             token = token.split(" ")[1]
             
-        payload = decode_access_token(token)
-        user_id_str = payload.get("sub")
-        
-        if user_id_str is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-            )
-        
-        # Convert string back to int
-        try:
-            user_id = int(user_id_str)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid user ID in token",
-            )
-        
-        user = db.query(User).filter(User.id == user_id).first()
-        
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-            )
-        return user
+        return resolve_user_from_token(token, db)
     except HTTPException:
         raise
     except Exception as e:
@@ -68,19 +44,22 @@ def get_current_user_from_query(
 def get_pictures(
     current_user: User = Depends(get_current_user)
 ):
-    """List all pictures (requires authentication)."""
-    return list_pictures()
+    """List all pictures (requires authentication), each with signed image URLs."""
+    # Served from the catalog's pre-serialized body; response_model documents it
+    return Response(content=picture_catalog.listing_json(current_user.id), media_type="application/json")
 
 
 @router.get("/{filename}")
 def get_picture(
     filename: str,
+    request: Request,
+    size: str = Query(thumbnails.ORIGINAL, pattern=thumbnails.SIZE_PATTERN, description="original, medium or thumb"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user_from_query)
 ):
     """
     Get a specific picture by filename (requires authentication via query param).
-    Returns the image as a FileResponse.
+    Supports ETag / If-Modified-Since revalidation (304) and byte ranges (206).
     """
     try:
         # Decode filename (handle URL encoding)
@@ -106,12 +85,29 @@ def get_picture(
         except Exception as e:
             print(f"Logging error (non-fatal): {repr(e)}")
 
+        etag = file_etag(file_path)
+        
+        # Serve a resized variant if requested (rendered and cached on first use)
+        variant = thumbnails.resolve_variant(file_path, size)
+        if variant is not None:
+            return cached_file_response(
+                request,
+                variant,
+                media_type=thumbnails.VARIANT_MEDIA_TYPE,
+                etag=variant_etag(etag, size),
+                cache_control=CACHE_PRIVATE,
+                filename=file_path.stem + thumbnails.VARIANT_EXTENSION
+            )
+        
         # Determine content type
         content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
         
-        return FileResponse(
-            path=file_path,
+        return cached_file_response(
+            request,
+            file_path,
             media_type=content_type,
+            etag=etag,
+            cache_control=CACHE_PRIVATE,
             filename=file_path.name
         )
     except HTTPException:
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -8,6 +8,9 @@ from app.models.user import User
 from app.models.todo import Todo
 from app.core.security import get_current_user, require_role
 from app.core.audit import log_action
+from app.core.pagination import paginate, set_next_cursor
+from app.services import counters
+from app.services.dashboard import invalidate_overview
 from app.schemas.todo import TodoCreate, TodoUpdate, TodoResponse
 
 router = APIRouter(prefix="/todos", tags=["todos"])
@@ -15,7 +18,10 @@ router = APIRouter(prefix="/todos", tags=["todos"])
 
 @router.get("", response_model=List[TodoResponse])
 def list_todos(
+    response: Response,
     done: Optional[int] = Query(None, description="Filter by done status: 0 or 1"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(["FRIEND"]))
 ):
@@ -25,7 +31,8 @@ def list_todos(
     if done is not None:
         query = query.filter(Todo.done == bool(done))
     
-    todos = query.order_by(Todo.created_at.desc()).all()
+    todos, next_cursor = paginate(query, Todo, limit, cursor)
+    set_next_cursor(response, next_cursor)
     return todos
 
 
@@ -42,7 +49,10 @@ def create_todo(
         done=False
     )
     db.add(new_todo)
+    counters.increment(db, counters.todo_total_key(current_user.id))
+    counters.increment(db, counters.todo_open_key(current_user.id))
     db.commit()
+    invalidate_overview()
     db.refresh(new_todo)
     
     # Log action
@@ -77,11 +87,13 @@ def update_todo(
     # Update fields
     if update.title is not None:
         todo.title = update.title
-    if update.done is not None:
+    if update.done is not None and update.done != todo.done:
         todo.done = update.done
+        counters.increment(db, counters.todo_open_key(current_user.id), -1 if update.done else 1)
     
     todo.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_overview()
     db.refresh(todo)
     
     # Log action
@@ -126,6 +138,10 @@ def delete_todo(
     )
     
     db.delete(todo)
+    counters.increment(db, counters.todo_total_key(todo.owner_id), -1)
+    if not todo.done:
+        counters.increment(db, counters.todo_open_key(todo.owner_id), -1)
     db.commit()
+    invalidate_overview()
     
     return None
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 
 class PictureInfo(BaseModel):
@@ -9,3 +9,5 @@ class PictureInfo(BaseModel):
     content_type: str
     created_at: float
     caption: Optional[str] = None
+    # Signed /media URLs keyed by size (original, medium, thumb)
+    urls: Optional[Dict[str, str]] = None
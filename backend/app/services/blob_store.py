@@ -0,0 +1,113 @@
+"""
+Content-addressed photo storage: each file is stored once under the SHA-256 of
+its bytes, so identical uploads and imports share a single blob.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Linux FICLONE ioctl: copy-on-write clone on btrfs / XFS / overlayfs-on-those
+FICLONE = 0x40049409
+
+# How a file was placed into the store
+PLACED_EXISTING = "existing"
+PLACED_REFLINK = "reflink"
+PLACED_HARDLINK = "hardlink"
+PLACED_COPY = "copy"
+
+UPLOAD_DIR = Path("uploads")
+if not UPLOAD_DIR.exists():
+    # Fallback for different CWD
+    UPLOAD_DIR = Path("backend/uploads")
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def blob_name(digest: str, ext: str) -> str:
+    """Stored filename for a blob."""
+    return f"{digest}{ext.lower()}"
+
+
+def store_copy(src: Path, blob_dir: Path, digest: str, ext: str) -> str:
+    """
+    Copy src into the store unless the blob already exists; returns the blob filename.
+    The copy goes through a temp file and an atomic rename so readers never see a partial blob.
+    """
+    filename = blob_name(digest, ext)
+    dest = blob_dir / filename
+    if dest.exists():
+        return filename
+    
+    fd, tmp = tempfile.mkstemp(suffix=".part", dir=str(blob_dir))
+    os.close(fd)
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return filename
+
+
+def _reflink(src: Path, dest: Path):
+    if fcntl is None:
+        raise OSError("reflink not supported on this platform")
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def place_file(src: Path, dest: Path) -> str:
+    """
+    Put src at dest without copying bytes where the filesystem allows it:
+    reflink first, then a hardlink, then a regular copy. The result appears
+    atomically (temp name + rename). Returns how the file was placed.
+
+    Hardlinks share the inode with the source, so this is only meant for
+    import sources that are not edited in place (the checked-in Picture/).
+    """
+    if dest.exists():
+        return PLACED_EXISTING
+    
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.part")
+    try:
+        try:
+            _reflink(src, tmp)
+            method = PLACED_REFLINK
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            try:
+                os.link(src, tmp)
+                method = PLACED_HARDLINK
+            except OSError:
+                shutil.copy2(src, tmp)
+                method = PLACED_COPY
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return method
+
+
+def store_link(src: Path, blob_dir: Path, digest: str, ext: str) -> Tuple[str, str]:
+    """Like store_copy, but links / clones where possible; returns (blob filename, method)."""
+    filename = blob_name(digest, ext)
+    return filename, place_file(src, blob_dir / filename)
@@ -0,0 +1,152 @@
+"""
+Incrementally maintained counters (unread messages, dashboard totals).
+
+Every change is written to the `stats` table inside the caller's transaction
+and mirrored in memory once that transaction commits, so reads never touch
+the database. The mirror is per-process: it assumes a single app worker,
+which is how the app is deployed (see render.yaml).
+"""
+import threading
+from typing import Dict
+from sqlalchemy import case, event, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import AsyncBridgeSession, SessionLocal
+from app.models.user import User
+from app.models.todo import Todo
+from app.models.message import Message
+from app.models.photo import Photo, PhotoStatus
+from app.models.stat import Stat
+
+MESSAGE_TOTAL = "message_total"
+PHOTO_PENDING = "photo_pending"
+
+_PENDING_DELTAS = "counter_deltas"
+
+_mirror: Dict[str, int] = {}
+_mirror_lock = threading.Lock()
+
+
+def todo_total_key(owner_id: int) -> str:
+    return f"todo_total:{owner_id}"
+
+
+def todo_open_key(owner_id: int) -> str:
+    return f"todo_open:{owner_id}"
+
+
+def unread_key(user_id: int) -> str:
+    return f"unread:{user_id}"
+
+
+def get_counter(key: str) -> int:
+    """Read a counter from the in-memory mirror."""
+    with _mirror_lock:
+        return _mirror.get(key, 0)
+
+
+def increment(db: Session, key: str, delta: int = 1):
+    """
+    Add delta to a counter as part of the session's current transaction.
+    The in-memory mirror is only updated if that transaction commits.
+    """
+    if delta == 0:
+        return
+    result = db.execute(
+        update(Stat).where(Stat.key == key).values(value=Stat.value + delta)
+    )
+    if result.rowcount == 0:
+        db.add(Stat(key=key, value=delta))
+        db.flush()
+    
+    _record_pending(db, key, delta)
+
+
+async def increment_async(db: AsyncSession, key: str, delta: int = 1):
+    """increment() for an AsyncSession."""
+    if delta == 0:
+        return
+    result = await db.execute(
+        update(Stat).where(Stat.key == key).values(value=Stat.value + delta)
+    )
+    if result.rowcount == 0:
+        db.add(Stat(key=key, value=delta))
+        await db.flush()
+    
+    _record_pending(db.sync_session, key, delta)
+
+
+def _record_pending(db: Session, key: str, delta: int):
+    pending = db.info.setdefault(_PENDING_DELTAS, {})
+    pending[key] = pending.get(key, 0) + delta
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(AsyncBridgeSession, "after_commit")
+def _apply_pending_deltas(session: Session):
+    pending = session.info.pop(_PENDING_DELTAS, None)
+    if not pending:
+        return
+    with _mirror_lock:
+        for key, delta in pending.items():
+            _mirror[key] = _mirror.get(key, 0) + delta
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+@event.listens_for(AsyncBridgeSession, "after_rollback")
+def _discard_pending_deltas(session: Session):
+    session.info.pop(_PENDING_DELTAS, None)
+
+
+def load_counters(db: Session):
+    """Fill the mirror from the stats table, recomputing it first if it is empty."""
+    rows = db.query(Stat).all()
+    if not rows:
+        recompute_counters(db)
+        return
+    with _mirror_lock:
+        _mirror.clear()
+        _mirror.update({row.key: row.value for row in rows})
+
+
+def recompute_counters(db: Session) -> Dict[str, int]:
+    """Rebuild every counter from the source tables (repairs drift)."""
+    values: Dict[str, int] = {MESSAGE_TOTAL: 0, PHOTO_PENDING: 0}
+    
+    for (user_id,) in db.query(User.id).all():
+        values[todo_total_key(user_id)] = 0
+        values[todo_open_key(user_id)] = 0
+        values[unread_key(user_id)] = 0
+    
+    todo_rows = db.query(
+        Todo.owner_id,
+        func.count(),
+        func.count(case((Todo.done == False, 1))),
+    ).group_by(Todo.owner_id).all()
+    for owner_id, total, open_count in todo_rows:
+        values[todo_total_key(owner_id)] = total
+        values[todo_open_key(owner_id)] = open_count
+    
+    values[MESSAGE_TOTAL] = db.query(func.count(Message.id)).scalar()
+    
+    unread_rows = db.query(Message.receiver_id, func.count()).filter(
+        Message.receiver_id != None,
+        Message.read_at == None
+    ).group_by(Message.receiver_id).all()
+    for receiver_id, count in unread_rows:
+        values[unread_key(receiver_id)] = count
+    
+    values[PHOTO_PENDING] = db.query(func.count(Photo.id)).filter(
+        Photo.status == PhotoStatus.PENDING
+    ).scalar()
+    
+    db.query(Stat).delete()
+    db.add_all([Stat(key=key, value=value) for key, value in values.items()])
+    db.info.pop(_PENDING_DELTAS, None)
+    db.commit()
+    
+    with _mirror_lock:
+        _mirror.clear()
+        _mirror.update(values)
+    return values
@@ -0,0 +1,85 @@
+from datetime import datetime, time, timedelta
+from fastapi import HTTPException
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+from app.models.audit_log import AuditLog
+from app.services import counters
+
+OVERVIEW_CACHE_KEY = "overview"
+
+# Audit actions that never show up in the overview, so they don't invalidate it
+IGNORED_AUDIT_ACTIONS = {"PICTURE_VIEW"}
+
+# Short-lived cache for the admin dashboard, which is polled constantly
+overview_cache = TTLCache(max_size=1, ttl_seconds=settings.OVERVIEW_CACHE_TTL_SECONDS)
+
+
+def invalidate_overview():
+    """Drop the cached overview (call after writes to todos, messages, photos or audit rows)."""
+    overview_cache.delete(OVERVIEW_CACHE_KEY)
+
+
+def get_overview_stats(db: Session) -> dict:
+    """Overview dashboard statistics, served from cache when fresh."""
+    overview = overview_cache.get(OVERVIEW_CACHE_KEY)
+    if overview is None:
+        overview = compute_overview(db)
+        overview_cache.set(OVERVIEW_CACHE_KEY, overview)
+    return overview
+
+
+def compute_overview(db: Session) -> dict:
+    """
+    Compute the overview. Todo, message and photo totals come from the
+    maintained counters; external calls need one aggregate query.
+    """
+    friend = db.query(User).filter(User.username == "wangzw").first()
+    if not friend:
+        raise HTTPException(status_code=404, detail="Friend user not found")
+    
+    now = datetime.utcnow()
+    # Range predicates (not func.date) so the created_at indexes stay usable
+    today_start = datetime.combine(now.date(), time.min)
+    last_7d = now - timedelta(days=7)
+    
+    external = db.execute(
+        select(
+            func.count(case((AuditLog.created_at >= today_start, 1))).label("external_call_today"),
+            func.count(case((AuditLog.created_at >= last_7d, 1))).label("external_call_last_7d"),
+        ).where(and_(
+            AuditLog.user_id == friend.id,
+            AuditLog.action == "EXTERNAL_CALL",
+            AuditLog.created_at >= min(today_start, last_7d),
+        ))
+    ).one()
+    
+    # Last actions (Exclude PICTURE_VIEW)
+    last_actions = db.query(AuditLog).filter(
+        and_(
+            AuditLog.user_id == friend.id,
+            AuditLog.action.notin_(IGNORED_AUDIT_ACTIONS)
+        )
+    ).order_by(AuditLog.created_at.desc()).limit(10).all()
+    
+    last_actions_data = []
+    for log in last_actions:
+        last_actions_data.append({
+            "id": log.id,
+            "action": log.action,
+            "resource_type": log.resource_type,
+            "created_at": log.created_at.isoformat()
+        })
+    
+    return {
+        "todo_total": counters.get_counter(counters.todo_total_key(friend.id)),
+        "todo_open": counters.get_counter(counters.todo_open_key(friend.id)),
+        "message_total": counters.get_counter(counters.MESSAGE_TOTAL),
+        "external_call_today": external.external_call_today,
+        "external_call_last_7d": external.external_call_last_7d,
+        "pending_photos": counters.get_counter(counters.PHOTO_PENDING),
+        "last_actions": last_actions_data
+    }
@@ -0,0 +1,86 @@
+"""
+In-process pub/sub for server-pushed message events (Server-Sent Events).
+
+Routers publish from any thread; each subscriber owns a bounded asyncio queue
+on the event loop that serves its stream. A subscriber whose queue fills up
+is marked dropped and its stream ends, so one slow client cannot grow memory
+without bound. Clients reconnect automatically (EventSource retry).
+"""
+import asyncio
+import json
+import threading
+from typing import Iterable, Optional, Set
+
+from app.core.config import settings
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Serialize one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class Subscriber:
+    """One connected stream."""
+    
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class EventBroker:
+    """Fan-out of pre-serialized SSE frames to connected subscribers."""
+    
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.dropped_count = 0
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+    
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+    
+    def subscribe(self, user_id: int) -> Subscriber:
+        """Register a stream; must be called from the event loop that will consume it."""
+        subscriber = Subscriber(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+    
+    def publish(self, event: str, data: dict, user_ids: Optional[Iterable[int]] = None):
+        """Send an event to the given users (or everyone). Safe to call from any thread."""
+        frame = format_sse(event, data)
+        targets = set(user_ids) if user_ids is not None else None
+        with self._lock:
+            subscribers = [
+                s for s in self._subscribers
+                if targets is None or s.user_id in targets
+            ]
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(self._deliver, subscriber, frame)
+            except RuntimeError:
+                # Event loop already closed
+                self.unsubscribe(subscriber)
+    
+    def _deliver(self, subscriber: Subscriber, frame: str):
+        if subscriber.dropped:
+            return
+        try:
+            subscriber.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Slow consumer: stop feeding it, its stream closes on the next iteration
+            subscriber.dropped = True
+            self.dropped_count += 1
+            self.unsubscribe(subscriber)
+
+
+# Global broker instance
+broker = EventBroker(queue_size=settings.EVENTS_QUEUE_SIZE)
@@ -1,6 +1,10 @@
 import httpx
-from typing import Any, Dict
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
 from app.core.config import settings
+from app.services.resilience import external_guard
 
 # HARDCODED VALUES - DO NOT ALLOW FRONTEND TO OVERRIDE
 HARDCODED_MODEL_NAME = "gpt-3.5-turbo"
@@ -9,12 +13,108 @@ HARDCODED_TEMPERATURE = 0.7
 HARDCODED_MAX_TOKENS = 800
 
 
-async def call_external_api(prompt: str) -> Dict[str, Any]:
+class ExternalHttpClient:
     """
-    Call external paid API with hardcoded parameters.
-    Only the prompt comes from user input.
+    Process-wide pooled httpx.AsyncClient for the external API.
+    Started and closed by the app lifespan so connections (and TLS sessions)
+    are reused across calls; created lazily if used outside the app.
     """
-    # Build request body with HARDCODED values
+    
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.http2 = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests_total = 0
+        self.started_at: Optional[float] = None
+    
+    def _build(self) -> httpx.AsyncClient:
+        http2 = settings.EXTERNAL_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("⚠️  EXTERNAL_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+                http2 = False
+        self.http2 = http2
+        return httpx.AsyncClient(
+            timeout=settings.EXTERNAL_API_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.EXTERNAL_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.EXTERNAL_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.EXTERNAL_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            http2=http2,
+        )
+    
+    async def start(self):
+        if self._client is None:
+            self._client = self._build()
+            self.started_at = time.time()
+    
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+            self.started_at = time.time()
+        return self._client
+    
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        self.in_flight += 1
+        self.requests_total += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self.client.post(url, **kwargs)
+        finally:
+            self.in_flight -= 1
+    
+    @asynccontextmanager
+    async def stream_post(self, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """POST with a streamed response body; counted as in flight until closed."""
+        self.in_flight += 1
+        self.requests_total += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            async with self.client.stream("POST", url, **kwargs) as response:
+                yield response
+        finally:
+            self.in_flight -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilization, for sizing EXTERNAL_HTTP_MAX_CONNECTIONS."""
+        stats = {
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "max_connections": settings.EXTERNAL_HTTP_MAX_CONNECTIONS,
+            "max_keepalive": settings.EXTERNAL_HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry_seconds": settings.EXTERNAL_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests_total": self.requests_total,
+            "connections": 0,
+            "idle_connections": 0,
+        }
+        # httpx does not expose its pool publicly; read httpcore's if it is there
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        stats["utilization"] = round(stats["in_flight"] / stats["max_connections"], 3) if stats["max_connections"] else 0.0
+        return stats
+
+
+# Global client instance (lifespan-owned)
+external_client = ExternalHttpClient()
+
+
+def build_request(prompt: str, stream: bool = False) -> Dict[str, Any]:
+    """Request body with the HARDCODED model parameters; only the prompt is user input."""
     request_body = {
         "model": HARDCODED_MODEL_NAME,
         "messages": [
@@ -30,20 +130,75 @@ async def call_external_api(prompt: str) -> Dict[str, Any]:
         "temperature": HARDCODED_TEMPERATURE,
         "max_tokens": HARDCODED_MAX_TOKENS
     }
-    
-    headers = {
+    if stream:
+        request_body["stream"] = True
+    return request_body
+
+
+def _headers() -> Dict[str, str]:
+    return {
         "Authorization": f"Bearer {settings.EXTERNAL_API_KEY}",
         "Content-Type": "application/json"
     }
-    
-    async with httpx.AsyncClient(timeout=settings.EXTERNAL_API_TIMEOUT_SECONDS) as client:
-        response = await client.post(
+
+
+async def call_external_api(prompt: str) -> Dict[str, Any]:
+    """
+    Call external paid API with hardcoded parameters.
+    Only the prompt comes from user input.
+    Bounded, retried and circuit-broken by external_guard.
+    """
+    async def attempt() -> Dict[str, Any]:
+        response = await external_client.post(
             settings.EXTERNAL_API_URL,
-            json=request_body,
-            headers=headers
+            json=build_request(prompt),
+            headers=_headers()
         )
         response.raise_for_status()
         return response.json()
+    
+    return await external_guard.call(attempt)
+
+
+def open_external_stream(prompt: str):
+    """
+    Async context manager for a streamed completion (OpenAI-style SSE).
+    Enter it to send the request; iterate iter_stream_text on the response.
+    Callers hold an external_guard.slot() for the stream's lifetime.
+    """
+    return external_client.stream_post(
+        settings.EXTERNAL_API_URL,
+        json=build_request(prompt, stream=True),
+        headers={**_headers(), "Accept": "text/event-stream"}
+    )
+
+
+async def iter_stream_text(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the text deltas of an upstream `data: {...}` event stream."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        text = extract_text_from_chunk(chunk)
+        if text:
+            yield text
+
+
+def extract_text_from_chunk(chunk: dict) -> str:
+    """Extract the delta text from one streamed chunk."""
+    try:
+        if "choices" in chunk and len(chunk["choices"]) > 0:
+            delta = chunk["choices"][0].get("delta", {})
+            return delta.get("content") or ""
+    except Exception:
+        pass
+    return ""
 
 
 def extract_text_from_response(raw_response: dict) -> str:
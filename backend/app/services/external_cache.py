@@ -0,0 +1,268 @@
+"""
+Response cache for external API calls.
+
+The model, temperature, system prompt and max tokens are hardcoded, so the
+upstream answer depends only on the prompt: identical prompts are served from
+the cache, and concurrent identical prompts share one in-flight upstream call.
+The backend is in-memory (TTLCache) or a local SQLite file that survives restarts.
+Backend failures (locked or corrupt cache file, full disk) are logged and the
+call goes on as a bypass: the cache never fails an external call.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.external_api import (
+    HARDCODED_MAX_TOKENS, HARDCODED_MODEL_NAME, HARDCODED_SYSTEM_PROMPT, HARDCODED_TEMPERATURE
+)
+
+logger = logging.getLogger(__name__)
+
+# How a response was obtained (recorded in the EXTERNAL_CALL audit meta)
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+CACHE_COALESCED = "coalesced"
+CACHE_BYPASS = "bypass"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Unicode NFC, unified line endings, no surrounding whitespace."""
+    return unicodedata.normalize("NFC", prompt).replace("\r\n", "\n").strip()
+
+
+def cache_key(prompt: str) -> str:
+    """SHA-256 over the normalized prompt and every hardcoded request parameter."""
+    material = json.dumps({
+        "model": HARDCODED_MODEL_NAME,
+        "system": HARDCODED_SYSTEM_PROMPT,
+        "temperature": HARDCODED_TEMPERATURE,
+        "max_tokens": HARDCODED_MAX_TOKENS,
+        "prompt": normalize_prompt(prompt),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """Process-local LRU with TTL; lost on restart."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: dict):
+        self._cache.set(key, value)
+
+    def size(self) -> int:
+        return self._cache.stats()["size"]
+
+    def close(self):
+        self._cache.clear()
+
+
+class SQLiteCacheBackend:
+    """Single-file SQLite store with TTL and LRU eviction (by last access)."""
+
+    def __init__(self, path: str, max_size: int, ttl_seconds: float):
+        self.path = path
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def _db(self) -> sqlite3.Connection:
+        """Open (or reopen after close) the cache file; called with the lock held."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS external_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_external_cache_last_access ON external_cache (last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT value, expires_at FROM external_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM external_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE external_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO external_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + self.ttl_seconds, now)
+            )
+            conn.execute("DELETE FROM external_cache WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM external_cache WHERE key IN ("
+                " SELECT key FROM external_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            )
+            conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM external_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ExternalResponseCache:
+    """Cache lookups plus coalescing of concurrent identical upstream calls."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def _get(self, key: str) -> Tuple[bool, Optional[dict]]:
+        """(ok, cached value); ok is False when the backend failed."""
+        try:
+            return True, await run_in_threadpool(self.backend.get, key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("External cache read failed, bypassing the cache: %r", e)
+            return False, None
+
+    async def lookup(self, prompt: str) -> Optional[dict]:
+        """Plain cache read (streaming path); counted as a hit or a miss."""
+        if not self.enabled:
+            return None
+        ok, raw = await self._get(cache_key(prompt))
+        if not ok:
+            return None
+        if raw is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return raw
+
+    async def store(self, prompt: str, raw: dict):
+        if not self.enabled:
+            return
+        try:
+            await run_in_threadpool(self.backend.set, cache_key(prompt), raw)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("External cache write failed, response not cached: %r", e)
+
+    async def get_or_fetch(self, prompt: str, fetch: Callable[[], Awaitable[dict]]) -> Tuple[dict, str]:
+        """Return (raw response, cache status); at most one upstream call per key at a time."""
+        if not self.enabled:
+            return await fetch(), CACHE_BYPASS
+
+        key = cache_key(prompt)
+        ok, raw = await self._get(key)
+        if not ok:
+            return await fetch(), CACHE_BYPASS
+        if raw is not None:
+            self.hits += 1
+            return raw, CACHE_HIT
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            status = CACHE_MISS
+            task = asyncio.ensure_future(self._fetch_and_store(prompt, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+            status = CACHE_COALESCED
+        # Shielded: a disconnecting caller must not cancel the call others wait on
+        return await asyncio.shield(task), status
+
+    async def _fetch_and_store(self, prompt: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        raw = await fetch()
+        # store() never raises: a paid upstream answer is returned even if caching it fails
+        await self.store(prompt, raw)
+        return raw
+
+    def _finish(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            task.exception()
+
+    def hit_rate(self) -> float:
+        """Share of lookups that did not need their own upstream call."""
+        total = self.hits + self.misses + self.coalesced
+        return round((self.hits + self.coalesced) / total, 3) if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            size = self.backend.size() if self.enabled else 0
+        except Exception as e:
+            logger.warning("External cache size unavailable: %r", e)
+            size = None
+        return {
+            "backend": settings.EXTERNAL_CACHE_BACKEND,
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+            "hit_rate": self.hit_rate(),
+        }
+
+    def close(self):
+        if self.enabled:
+            self.backend.close()
+
+
+def _build_backend():
+    kind = settings.EXTERNAL_CACHE_BACKEND.lower()
+    if kind == "memory":
+        return MemoryCacheBackend(settings.EXTERNAL_CACHE_MAX_SIZE, settings.EXTERNAL_CACHE_TTL_SECONDS)
+    if kind == "sqlite":
+        return SQLiteCacheBackend(
+            settings.EXTERNAL_CACHE_PATH, settings.EXTERNAL_CACHE_MAX_SIZE, settings.EXTERNAL_CACHE_TTL_SECONDS
+        )
+    if kind not in ("none", "off", ""):
+        print(f"⚠️  Unknown EXTERNAL_CACHE_BACKEND={kind!r}; external response cache disabled")
+    return None
+
+
+# Global cache instance
+external_cache = ExternalResponseCache(_build_backend())
@@ -0,0 +1,146 @@
+"""
+Liveness and readiness checks for the load balancer.
+
+Liveness only says the process is answering. Readiness fails until the
+lifespan startup has finished (and again once shutdown begins), and checks
+DB connectivity with its latency, the Picture and uploads directories, free
+disk space and the external API circuit. Readiness results are cached for
+HEALTH_CACHE_SECONDS, so frequent probes from several sources cost one check.
+"""
+import asyncio
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import async_engine
+from app.services.blob_store import UPLOAD_DIR
+from app.services.picture import PICTURE_DIR
+from app.services.resilience import CIRCUIT_OPEN, external_guard
+
+STATUS_OK = "ok"
+STATUS_DEGRADED = "degraded"
+STATUS_FAIL = "fail"
+
+
+def _overall(checks: Dict[str, Dict[str, Any]]) -> str:
+    statuses = {check["status"] for check in checks.values()}
+    if STATUS_FAIL in statuses:
+        return STATUS_FAIL
+    if STATUS_DEGRADED in statuses:
+        return STATUS_DEGRADED
+    return STATUS_OK
+
+
+class HealthChecker:
+    """Readiness state plus the short-lived cache of the last readiness result."""
+
+    def __init__(self, cache_seconds: float):
+        self.cache_seconds = cache_seconds
+        self.ready = False
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def mark_ready(self):
+        self.ready = True
+        self._cached = None
+
+    def mark_stopping(self):
+        self.ready = False
+        self._cached = None
+
+    async def readiness(self) -> Dict[str, Any]:
+        if not self.ready:
+            return {"status": STATUS_FAIL, "checks": {"lifespan": {"status": STATUS_FAIL, "detail": "not started"}}}
+        if self._fresh():
+            return self._cached
+        # One probe runs the checks; concurrent probes wait for its result
+        async with self._lock:
+            if not self._fresh():
+                self._cached = await self._run_checks()
+                self._cached_at = time.monotonic()
+            return self._cached
+
+    def _fresh(self) -> bool:
+        return self._cached is not None and time.monotonic() - self._cached_at < self.cache_seconds
+
+    async def _run_checks(self) -> Dict[str, Any]:
+        checks: Dict[str, Dict[str, Any]] = {"database": await self._check_database()}
+        checks.update(await run_in_threadpool(self._check_filesystem))
+        external = self._check_external()
+        if external is not None:
+            checks["external_api"] = external
+        return {
+            "status": _overall(checks),
+            "checked_at": time.time(),
+            "checks": checks,
+        }
+
+    async def _check_database(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+
+        async def ping():
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        try:
+            await asyncio.wait_for(ping(), timeout=settings.HEALTH_DB_TIMEOUT_SECONDS)
+        except Exception as e:
+            return {
+                "status": STATUS_FAIL,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                "error": type(e).__name__,
+            }
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        return {
+            "status": STATUS_DEGRADED if latency_ms > settings.HEALTH_DB_SLOW_MS else STATUS_OK,
+            "latency_ms": latency_ms,
+        }
+
+    def _check_filesystem(self) -> Dict[str, Dict[str, Any]]:
+        checks = {
+            "pictures_dir": self._check_directory(PICTURE_DIR, writable=False),
+            "uploads_dir": self._check_directory(UPLOAD_DIR, writable=True),
+        }
+        try:
+            usage = shutil.disk_usage(UPLOAD_DIR if UPLOAD_DIR.exists() else Path("."))
+        except OSError as e:
+            checks["disk"] = {"status": STATUS_FAIL, "error": type(e).__name__}
+        else:
+            free_mb = usage.free // (1024 * 1024)
+            checks["disk"] = {
+                "status": STATUS_OK if free_mb >= settings.HEALTH_MIN_FREE_DISK_MB else STATUS_FAIL,
+                "free_mb": free_mb,
+                "used_percent": round(usage.used / usage.total * 100, 1) if usage.total else 0.0,
+            }
+        return checks
+
+    @staticmethod
+    def _check_directory(path: Path, writable: bool) -> Dict[str, Any]:
+        mode = os.R_OK | os.W_OK if writable else os.R_OK
+        if not path.is_dir():
+            return {"status": STATUS_FAIL, "path": str(path), "detail": "missing"}
+        if not os.access(path, mode):
+            return {"status": STATUS_FAIL, "path": str(path), "detail": "not writable" if writable else "not readable"}
+        return {"status": STATUS_OK, "path": str(path)}
+
+    @staticmethod
+    def _check_external() -> Optional[Dict[str, Any]]:
+        """Open circuit = degraded, not unready: other instances share the same upstream."""
+        if not settings.EXTERNAL_API_URL:
+            return None
+        circuit = external_guard.breaker.stats()
+        return {
+            "status": STATUS_DEGRADED if circuit["state"] == CIRCUIT_OPEN else STATUS_OK,
+            "circuit": circuit["state"],
+        }
+
+
+# Global health checker (readiness flipped by the lifespan)
+health_checker = HealthChecker(cache_seconds=settings.HEALTH_CACHE_SECONDS)
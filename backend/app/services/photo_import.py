@@ -0,0 +1,226 @@
+"""
+Bulk photo import from a directory (Picture/) into the content-addressed store.
+
+Used by import_pictures.py (Render build) and import_photos.py. Existing rows
+are prefetched in one query, files are hashed and linked / copied by a thread
+pool, and new rows go in with a single bulk insert. A JSON-lines manifest
+remembers the hash of every processed file, so an interrupted or repeated
+import does not hash or copy unchanged files again.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.photo import Photo, PhotoStatus
+from app.services.blob_store import PLACED_EXISTING, hash_file, place_file, store_link
+
+IMPORT_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+MANIFEST_NAME = ".import-manifest.jsonl"
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+
+@dataclass
+class ImportedFile:
+    source: Path
+    digest: str
+    filename: str
+    size: int
+    mtime: float
+    placed: str
+    hashed: bool
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    hashed: int = 0
+    bytes_processed: int = 0
+    elapsed: float = 0.0
+    placed: Dict[str, int] = field(default_factory=dict)
+    new_files: List[str] = field(default_factory=list)
+
+    @property
+    def files_per_second(self) -> float:
+        return (self.imported + self.skipped) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_processed / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        placed = ", ".join(f"{k}={v}" for k, v in sorted(self.placed.items())) or "none"
+        return (
+            f"Imported: {self.imported}, skipped: {self.skipped}, failed: {self.failed}\n"
+            f"  Hashed: {self.hashed} files (others reused from the manifest); placed: {placed}\n"
+            f"  {self.bytes_processed / (1024 * 1024):.1f} MB in {self.elapsed:.2f}s "
+            f"({self.files_per_second:.1f} files/s, {self.mb_per_second:.1f} MB/s)"
+        )
+
+
+class ImportManifest:
+    """Append-only record of (name, size, mtime_ns) -> digest for processed files."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[(entry["name"], entry["size"], entry["mtime_ns"])] = entry["sha256"]
+                    except (ValueError, KeyError):
+                        # A line cut short by an interrupted run
+                        continue
+
+    def lookup(self, name: str, stat: os.stat_result) -> Optional[str]:
+        return self.entries.get((name, stat.st_size, stat.st_mtime_ns))
+
+    def record(self, name: str, stat: os.stat_result, digest: str):
+        key = (name, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if self.entries.get(key) == digest:
+                return
+            self.entries[key] = digest
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps({"name": name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}) + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _process_file(
+    file_path: Path,
+    uploads_dir: Path,
+    manifest: ImportManifest,
+    legacy_filename: Optional[str]
+) -> ImportedFile:
+    """Hash (unless the manifest already knows the file) and place it in uploads/."""
+    stat = file_path.stat()
+    digest = manifest.lookup(file_path.name, stat)
+    hashed = digest is None
+    if hashed:
+        digest = hash_file(file_path)
+
+    if legacy_filename is not None:
+        # Legacy rows (imported by original filename) keep their name
+        filename = legacy_filename
+        placed = place_file(file_path, uploads_dir / filename)
+    else:
+        filename, placed = store_link(file_path, uploads_dir, digest, file_path.suffix)
+
+    manifest.record(file_path.name, stat, digest)
+    return ImportedFile(file_path, digest, filename, stat.st_size, stat.st_mtime, placed, hashed)
+
+
+def import_directory(
+    db: Session,
+    source_dir: Path,
+    uploads_dir: Path,
+    uploader_id: int,
+    workers: int = DEFAULT_WORKERS,
+    manifest_path: Optional[Path] = None,
+    created_at_from_mtime: bool = False,
+    mark_reviewed: bool = True
+) -> ImportReport:
+    """
+    Import every image in source_dir as an approved photo. Commits once.
+    Files whose content is already stored are skipped (and restored to
+    uploads/ if their blob went missing).
+    """
+    start = time.perf_counter()
+    report = ImportReport()
+    uploads_dir.mkdir(parents=True, exist_ok=True)
+    manifest = ImportManifest(manifest_path or uploads_dir / MANIFEST_NAME)
+
+    # One round-trip for everything already imported
+    known_hashes = set()
+    legacy_by_filename: Dict[str, Photo] = {}
+    for photo in db.query(Photo):
+        if photo.content_hash is not None:
+            known_hashes.add(photo.content_hash)
+        else:
+            legacy_by_filename[photo.filename] = photo
+
+    sources = sorted(
+        entry for entry in source_dir.iterdir()
+        if entry.is_file() and entry.suffix.lower() in IMPORT_EXTENSIONS
+    )
+
+    results: List[ImportedFile] = []
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="photo-import") as pool:
+        futures = [
+            (
+                file_path,
+                pool.submit(
+                    _process_file, file_path, uploads_dir, manifest,
+                    legacy_by_filename[file_path.name].filename if file_path.name in legacy_by_filename else None
+                )
+            )
+            for file_path in sources
+        ]
+        for file_path, future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Failed to import {file_path.name}: {repr(e)}")
+                report.failed += 1
+    manifest.close()
+
+    now = datetime.utcnow()
+    rows = []
+    for item in results:
+        report.bytes_processed += item.size
+        report.hashed += int(item.hashed)
+        report.placed[item.placed] = report.placed.get(item.placed, 0) + 1
+
+        legacy = legacy_by_filename.get(item.source.name)
+        if legacy is not None:
+            if item.digest not in known_hashes:
+                legacy.content_hash = item.digest
+                known_hashes.add(item.digest)
+            report.skipped += 1
+            continue
+        if item.digest in known_hashes:
+            if item.placed != PLACED_EXISTING:
+                print(f"  → Restored {item.filename} to uploads/")
+            report.skipped += 1
+            continue
+
+        known_hashes.add(item.digest)
+        rows.append({
+            "filename": item.filename,
+            "content_hash": item.digest,
+            "uploader_id": uploader_id,
+            "status": PhotoStatus.APPROVED,
+            "created_at": datetime.fromtimestamp(item.mtime) if created_at_from_mtime else now,
+            "reviewed_at": now if mark_reviewed else None,
+            "reviewed_by": uploader_id if mark_reviewed else None,
+        })
+        report.new_files.append(item.filename)
+        print(f"Imported: {item.source.name} -> {item.filename}")
+
+    if rows:
+        db.execute(insert(Photo), rows)
+    db.commit()
+
+    report.imported = len(rows)
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -1,8 +1,14 @@
 import os
+import json
 import mimetypes
+import threading
+import time
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 from fastapi import HTTPException
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.media_signing import PICTURE, expiry, media_urls
 from app.schemas.picture import PictureInfo
 
 PICTURE_DIR = Path(__file__).parent.parent.parent / "Picture"
@@ -28,23 +34,106 @@ def is_safe_filename(filename: str) -> bool:
     return True
 
 
-def list_pictures() -> List[PictureInfo]:
-    """List all pictures in the Picture directory."""
-    picture_dir = get_picture_directory()
-    pictures = []
+class PictureCatalog:
+    """
+    In-memory index of the Picture directory.
+
+    Scanned once at startup and rescanned only when the directory mtime changes
+    (files added, removed or renamed). The mtime itself is checked at most every
+    PICTURE_CATALOG_CHECK_SECONDS, so listings and lookups normally never touch
+    the filesystem. Files overwritten in place keep the directory mtime and are
+    picked up on the next rescan.
+    """
     
-    for file_path in picture_dir.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in ALLOWED_EXTENSIONS:
-            content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
-            stat = file_path.stat()
+    def __init__(self, directory: Path, check_interval: float):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.version = 0
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = 0.0
+        self._pictures: List[PictureInfo] = []
+        self._index: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+        # (catalog version, user id, URL expiry) -> serialized listing
+        self._listings = TTLCache(max_size=64, ttl_seconds=settings.MEDIA_URL_BUCKET_SECONDS)
+    
+    def _scan(self):
+        pictures = []
+        index = {}
+        root = self.directory.resolve()
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or Path(entry.name).suffix.lower() not in ALLOWED_EXTENSIONS:
+                continue
+            file_path = Path(entry.path)
+            try:
+                # Symlinks pointing outside the directory are never served
+                file_path.resolve().relative_to(root)
+            except ValueError:
+                continue
+            stat = entry.stat()
             pictures.append(PictureInfo(
-                name=file_path.name,
+                name=entry.name,
                 size=stat.st_size,
-                content_type=content_type,
+                content_type=mimetypes.guess_type(entry.name)[0] or "application/octet-stream",
                 created_at=stat.st_mtime
             ))
+            index[entry.name] = file_path
+        pictures.sort(key=lambda x: x.created_at, reverse=True)
+        return pictures, index
+    
+    def refresh(self, force: bool = False):
+        """Rescan if the directory changed; the mtime check itself is throttled."""
+        now = time.monotonic()
+        if not force and self._mtime_ns is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            mtime_ns = get_picture_directory().stat().st_mtime_ns
+            self._checked_at = now
+            if mtime_ns == self._mtime_ns:
+                return
+            self._pictures, self._index = self._scan()
+            self._mtime_ns = mtime_ns
+            self.version += 1
+            self._listings.clear()
+        print(f"🖼️  Picture catalog loaded: {len(self._pictures)} pictures")
     
-    return sorted(pictures, key=lambda x: x.created_at, reverse=True)
+    def list(self) -> List[PictureInfo]:
+        self.refresh()
+        return self._pictures
+    
+    def lookup(self, filename: str) -> Optional[Path]:
+        self.refresh()
+        path = self._index.get(filename)
+        if path is None:
+            # A file added since the last check: one stat to confirm, rescan if changed
+            self.refresh(force=True)
+            path = self._index.get(filename)
+        return path
+    
+    def listing_json(self, user_id: int) -> bytes:
+        """
+        Serialized GET /pictures body with the user's signed URLs. URL expiry is
+        bucketed, so the bytes are reused until the bucket or the catalog changes.
+        """
+        pictures = self.list()
+        exp = expiry()
+        key = (self.version, user_id, exp)
+        body = self._listings.get(key)
+        if body is None:
+            body = json.dumps([
+                {**picture.model_dump(), "urls": media_urls(PICTURE, picture.name, user_id, exp)}
+                for picture in pictures
+            ], ensure_ascii=False).encode("utf-8")
+            self._listings.set(key, body)
+        return body
+
+
+picture_catalog = PictureCatalog(PICTURE_DIR, settings.PICTURE_CATALOG_CHECK_SECONDS)
+
+
+def list_pictures() -> List[PictureInfo]:
+    """List all pictures in the Picture directory (newest first)."""
+    return picture_catalog.list()
 
 
 def get_picture_path(filename: str) -> Path:
@@ -52,16 +141,9 @@ def get_picture_path(filename: str) -> Path:
     if not is_safe_filename(filename):
         raise HTTPException(status_code=400, detail="Invalid filename")
     
-    picture_dir = get_picture_directory()
-    file_path = picture_dir / filename
-    
-    if not file_path.exists() or not file_path.is_file():
+    # The catalog only indexes regular files resolved inside the Picture directory
+    file_path = picture_catalog.lookup(filename)
+    if file_path is None:
         raise HTTPException(status_code=404, detail="Picture not found")
     
-    # Additional safety: ensure file is actually within Picture directory
-    try:
-        file_path.resolve().relative_to(picture_dir.resolve())
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     return file_path
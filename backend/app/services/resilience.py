@@ -0,0 +1,260 @@
+"""
+Resilience layer for the external API: an in-flight cap with a queue-wait
+timeout, retries with exponential backoff + full jitter (honoring
+Retry-After), and a circuit breaker that fails fast while the upstream is down.
+"""
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Upstream statuses worth retrying (rate limited / transient server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class ExternalUnavailableError(Exception):
+    """Rejected without calling the upstream; maps to 503 with Retry-After."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(ExternalUnavailableError):
+    pass
+
+
+class UpstreamBusyError(ExternalUnavailableError):
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return False
+
+
+def is_upstream_failure(exc: Exception) -> bool:
+    """Whether an error says the upstream is unhealthy (429 / 4xx do not)."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures; after
+    `reset_timeout` seconds one probe call is let through (half-open), and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.total_failures = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        if self.state == CIRCUIT_OPEN and self.retry_after() <= 0:
+            self.state = CIRCUIT_HALF_OPEN
+        if self.state == CIRCUIT_CLOSED:
+            return
+        if self.state == CIRCUIT_HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError("External API circuit is open", max(self.retry_after(), 1.0))
+
+    def record_success(self):
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CIRCUIT_OPEN:
+                print(f"⚠️  External API circuit opened after {self.consecutive_failures} failures")
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """A probe that ended without an upstream verdict (e.g. cancelled)."""
+        self.probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        if self.state == CIRCUIT_OPEN and self.retry_after() <= 0:
+            state = CIRCUIT_HALF_OPEN
+        else:
+            state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after_seconds": round(self.retry_after(), 1) if state == CIRCUIT_OPEN else 0,
+            "total_failures": self.total_failures,
+            "rejected": self.rejected,
+        }
+
+
+class ExternalGuard:
+    """In-flight cap, retries and circuit breaker for upstream calls."""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        queue_timeout: float,
+        retry_attempts: int,
+        retry_base: float,
+        retry_max: float,
+        breaker: CircuitBreaker
+    ):
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.retry_attempts = max(retry_attempts, 1)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.breaker = breaker
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.queue_timeouts = 0
+        self.retries = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Circuit check, then wait (bounded) for one of the in-flight slots."""
+        self.breaker.allow()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            self.breaker.release_probe()
+            raise UpstreamBusyError("Too many external API calls in flight", self.queue_timeout)
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def record(self, exc: Optional[BaseException]):
+        """Feed the outcome of one upstream attempt to the circuit breaker."""
+        if exc is None:
+            self.breaker.record_success()
+        elif isinstance(exc, Exception) and is_upstream_failure(exc):
+            self.breaker.record_failure()
+        elif isinstance(exc, httpx.HTTPStatusError):
+            # The upstream answered (4xx): it is up
+            self.breaker.record_success()
+        else:
+            self.breaker.release_probe()
+
+    def backoff(self, attempt: int, exc: Exception) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up now."""
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self.retry_max:
+                    return None
+                delay = max(delay, retry_after)
+        return delay
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Run attempt() with a slot per try, retrying transient failures."""
+        for n in range(self.retry_attempts):
+            try:
+                async with self.slot():
+                    try:
+                        result = await attempt()
+                    except BaseException as e:
+                        self.record(e)
+                        raise
+                    self.record(None)
+                    return result
+            except ExternalUnavailableError:
+                raise
+            except Exception as e:
+                if n == self.retry_attempts - 1 or not is_retryable(e):
+                    raise
+                delay = self.backoff(n, e)
+                if delay is None:
+                    raise
+                self.retries += 1
+                print(f"External API attempt {n + 1} failed ({type(e).__name__}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.stats(),
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "queue_timeouts": self.queue_timeouts,
+            "retries": self.retries,
+        }
+
+
+# Global guard for the external API
+external_guard = ExternalGuard(
+    max_in_flight=settings.EXTERNAL_MAX_IN_FLIGHT,
+    queue_timeout=settings.EXTERNAL_QUEUE_TIMEOUT_SECONDS,
+    retry_attempts=settings.EXTERNAL_RETRY_ATTEMPTS,
+    retry_base=settings.EXTERNAL_RETRY_BASE_SECONDS,
+    retry_max=settings.EXTERNAL_RETRY_MAX_SECONDS,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.EXTERNAL_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.EXTERNAL_BREAKER_RESET_SECONDS
+    )
+)
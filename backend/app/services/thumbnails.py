@@ -0,0 +1,142 @@
+"""
+Derivative images (thumbnail / medium) for photos and pictures.
+
+Variants live in a `.variants/` directory next to the originals and are
+rendered in a process pool so resizing never runs on the request thread's
+CPU budget. They are scheduled when a photo is approved or imported, and
+rendered lazily on first request otherwise. Pillow is optional: without it
+(or if rendering fails) the original file is served.
+"""
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.core.config import settings
+
+try:
+    from PIL import Image, ImageOps, features
+    WEBP_SUPPORTED = features.check("webp")
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+    WEBP_SUPPORTED = False
+
+ORIGINAL = "original"
+
+# Variant name -> longest edge in pixels
+VARIANTS = {
+    "thumb": 320,
+    "medium": 1280,
+}
+
+# Query pattern for size= parameters
+SIZE_PATTERN = "^(" + "|".join([ORIGINAL, *VARIANTS]) + ")$"
+
+VARIANT_DIR_NAME = ".variants"
+VARIANT_FORMAT = "WEBP" if WEBP_SUPPORTED else "JPEG"
+VARIANT_EXTENSION = ".webp" if WEBP_SUPPORTED else ".jpg"
+VARIANT_MEDIA_TYPE = "image/webp" if WEBP_SUPPORTED else "image/jpeg"
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS)
+    return _pool
+
+
+def shutdown():
+    """Stop the worker pool (app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def variant_path(original: Path, variant: str) -> Path:
+    return original.parent / VARIANT_DIR_NAME / f"{original.name}.{variant}{VARIANT_EXTENSION}"
+
+
+def _is_fresh(original: Path, variant_file: Path) -> bool:
+    try:
+        return variant_file.stat().st_mtime >= original.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def render_variant(original: str, dest: str, max_px: int, fmt: str) -> str:
+    """Resize one image (runs in a worker process). Written via temp file + rename."""
+    dest_path = Path(dest)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(original) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_px, max_px))
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        fd, tmp = tempfile.mkstemp(suffix=".part", dir=str(dest_path.parent))
+        os.close(fd)
+        try:
+            img.save(tmp, format=fmt, quality=80)
+            os.replace(tmp, dest_path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    return dest
+
+
+def _submit(original: Path, variant: str) -> Future:
+    return _get_pool().submit(
+        render_variant, str(original), str(variant_path(original, variant)),
+        VARIANTS[variant], VARIANT_FORMAT
+    )
+
+
+def schedule_variants(original: Path):
+    """Render all missing variants in the background (photo approved or imported)."""
+    if Image is None:
+        return
+    for variant in VARIANTS:
+        if not _is_fresh(original, variant_path(original, variant)):
+            _submit(original, variant)
+
+
+def generate_variants(originals: Iterable[Path]) -> int:
+    """Render all missing variants for many images in parallel and wait (import scripts)."""
+    if Image is None:
+        return 0
+    futures = [
+        (original, _submit(original, variant))
+        for original in originals
+        for variant in VARIANTS
+        if not _is_fresh(original, variant_path(original, variant))
+    ]
+    rendered = 0
+    for original, future in futures:
+        try:
+            future.result()
+            rendered += 1
+        except Exception as e:
+            print(f"Variant error for {original.name}: {repr(e)}")
+    return rendered
+
+
+def resolve_variant(original: Path, size: str) -> Optional[Path]:
+    """
+    Path of the requested variant, rendering it on first request.
+    Returns None when the original should be served instead.
+    Blocks the calling (threadpool) thread while a worker process renders.
+    """
+    if size == ORIGINAL or size not in VARIANTS or Image is None:
+        return None
+    path = variant_path(original, size)
+    if _is_fresh(original, path):
+        return path
+    try:
+        _submit(original, size).result()
+        return path
+    except Exception as e:
+        print(f"Variant error for {original.name}: {repr(e)}")
+        return None
@@ -0,0 +1,185 @@
+"""
+Streaming multipart upload: the request body is parsed chunk by chunk, so an
+oversized file is rejected as soon as it crosses the limit instead of after
+the whole body has been spooled. File writes and hashing run in the
+threadpool; the finished file is moved into place with an atomic rename.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+import multipart
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import parse_options_header
+from fastapi import HTTPException, Request
+from starlette.requests import ClientDisconnect
+from starlette.concurrency import run_in_threadpool
+
+# Extra bytes allowed in Content-Length for multipart boundaries and part headers
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class ReceivedFile:
+    """A fully received upload sitting in a temp file next to its destination."""
+    
+    def __init__(self, filename: str, temp_path: Path, size: int, sha256: str):
+        self.filename = filename
+        self.temp_path = temp_path
+        self.size = size
+        self.sha256 = sha256
+    
+    @property
+    def extension(self) -> str:
+        return Path(self.filename).suffix.lower()
+    
+    def move_to(self, dest: Path):
+        """Atomically rename the temp file into place."""
+        os.replace(self.temp_path, dest)
+    
+    def discard(self):
+        try:
+            os.unlink(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_chunk(fh, hasher, data: bytes):
+    hasher.update(data)
+    fh.write(data)
+
+
+class _FilePartReader:
+    """Collects multipart parser callbacks; file data is written by the async loop."""
+    
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.events: List[Tuple[str, object]] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+    
+    def on_part_begin(self):
+        self._disposition = b""
+    
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+    
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+    
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+    
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        if name == self.field_name and filename is not None:
+            self.events.append(("begin", filename.decode("utf-8", "replace")))
+        else:
+            self.events.append(("skip", None))
+    
+    def on_part_data(self, data: bytes, start: int, end: int):
+        self.events.append(("data", data[start:end]))
+    
+    def on_part_end(self):
+        self.events.append(("end", None))
+    
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+
+async def receive_file(
+    request: Request,
+    dest_dir: Path,
+    max_size: int,
+    allowed_extensions: Set[str],
+    field_name: str = "file",
+) -> ReceivedFile:
+    """
+    Stream the named file field of a multipart request into a temp file in dest_dir,
+    enforcing max_size and computing a SHA-256 along the way.
+    Raises 400 for bad requests/extensions and 413 as soon as the limit is exceeded.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data upload")
+    
+    too_large = HTTPException(status_code=413, detail=f"File too large. Max {max_size // (1024 * 1024)}MB.")
+    
+    # Reject before reading anything when the declared body is already too big
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise too_large
+    
+    reader = _FilePartReader(field_name)
+    parser = multipart.MultipartParser(params[b"boundary"], reader.callbacks())
+    hasher = hashlib.sha256()
+    
+    fh = None
+    temp_path: Optional[Path] = None
+    filename: Optional[str] = None
+    in_file_part = False
+    done = False
+    size = 0
+    
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                for kind, value in reader.events:
+                    if kind == "begin" and not done:
+                        filename = value
+                        if Path(filename).suffix.lower() not in allowed_extensions:
+                            raise HTTPException(
+                                status_code=400,
+                                detail="Invalid file type. Only " + ", ".join(
+                                    sorted(e.lstrip(".") for e in allowed_extensions)
+                                ) + " allowed."
+                            )
+                        fd, name = await run_in_threadpool(
+                            tempfile.mkstemp, suffix=".part", dir=str(dest_dir)
+                        )
+                        temp_path = Path(name)
+                        fh = os.fdopen(fd, "wb")
+                        in_file_part = True
+                    elif kind == "data" and in_file_part:
+                        size += len(value)
+                        if size > max_size:
+                            raise too_large
+                        await run_in_threadpool(_write_chunk, fh, hasher, value)
+                    elif kind == "end" and in_file_part:
+                        in_file_part = False
+                        done = True
+                reader.events.clear()
+            parser.finalize()
+        except (MultipartParseError, ClientDisconnect):
+            raise HTTPException(status_code=400, detail="Malformed multipart body")
+    except BaseException:
+        if fh is not None:
+            fh.close()
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+        raise
+    
+    if fh is not None:
+        await run_in_threadpool(fh.close)
+    if not done:
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    
+    return ReceivedFile(filename=filename, temp_path=temp_path, size=size, sha256=hasher.hexdigest())
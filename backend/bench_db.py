@@ -0,0 +1,129 @@
+"""
+Compare the sync (threadpool) and async database paths under concurrent load.
+
+Serves two copies of the message-list query from a throwaway app - one as a
+sync def endpoint on SessionLocal, one as an async def endpoint on
+AsyncSessionLocal - and hammers each with the same number of concurrent
+clients, reporting requests/s and latency percentiles:
+
+    DATABASE_URL=postgresql://... python bench_db.py --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.pagination import paginate, paginate_async
+from app.db.session import get_async_db, get_db
+from app.models.message import Message
+from app.models.user import User
+
+PAGE_SIZE = 50
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def list_sync(db: Session = Depends(get_db)):
+        query = db.query(Message, User.username).outerjoin(User, User.id == Message.sender_id)
+        rows, _ = paginate(query, Message, PAGE_SIZE)
+        return {"rows": len(rows)}
+
+    @app.get("/async")
+    async def list_async(db: AsyncSession = Depends(get_async_db)):
+        stmt = select(Message, User.username).outerjoin(User, User.id == Message.sender_id)
+        rows, _ = await paginate_async(db, stmt, Message, PAGE_SIZE)
+        return {"rows": len(rows)}
+
+    return app
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(build_app(), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_load(base_url: str, path: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        # Warm up connections and pools before timing
+        await asyncio.gather(*(client.get(path) for _ in range(min(concurrency, 16))))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else 0.0
+    return {
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "mean": statistics.mean(latencies) * 1000 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async DB endpoints")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per mode")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=3, help="alternating rounds per mode")
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"Benchmarking {args.requests} requests x {args.rounds} rounds at concurrency {args.concurrency}")
+
+    results = {"sync": [], "async": []}
+    try:
+        for round_no in range(args.rounds):
+            for mode in ("sync", "async"):
+                result = await run_load(base_url, f"/{mode}", args.requests, args.concurrency)
+                results[mode].append(result)
+                print(
+                    f"  round {round_no + 1} {mode:>5}: {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50']:6.1f}ms  p95 {result['p95']:6.1f}ms  "
+                    f"p99 {result['p99']:6.1f}ms  errors {result['errors']}"
+                )
+    finally:
+        server.should_exit = True
+
+    print("\nBest round per mode:")
+    for mode, runs in results.items():
+        best = max(runs, key=lambda r: r["rps"])
+        print(f"  {mode:>5}: {best['rps']:8.1f} req/s  p95 {best['p95']:6.1f}ms  p99 {best['p99']:6.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
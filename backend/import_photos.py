@@ -1,8 +1,5 @@
 import os
 import sys
-import shutil
-import uuid
-from datetime import datetime
 from pathlib import Path
 
 # Add backend to sys.path
@@ -10,7 +7,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.db.session import SessionLocal
 from app.models.user import User
-from app.models.photo import Photo, PhotoStatus
+from app.services import thumbnails
+from app.services.photo_import import import_directory
 
 def import_photos():
     db = SessionLocal()
@@ -31,41 +29,21 @@ def import_photos():
             print(f"Source directory {source_dir} does not exist.")
             return
 
-        count = 0
         print(f"Scanning {source_dir.absolute()}...")
+        report = import_directory(
+            db,
+            source_dir,
+            target_dir,
+            uploader_id=uploader_id,
+            created_at_from_mtime=True,
+            mark_reviewed=False
+        )
+        print(f"Successfully imported {report.imported} photos ({report.skipped} already stored).")
+        print(report.summary())
         
-        for file_path in source_dir.glob("*.*"):
-            if file_path.suffix.lower() not in ['.jpg', '.jpeg', '.png', '.webp']:
-                continue
-
-            # Generate new name to avoid encoding issues and collisions
-            ext = file_path.suffix.lower()
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            random_str = str(uuid.uuid4())[:8]
-            new_filename = f"{timestamp}_{random_str}{ext}"
-            
-            target_path = target_dir / new_filename
-            
-            # Copy file
-            shutil.copy2(file_path, target_path)
-            
-            # Create DB record
-            # Use file modification time for created_at
-            mtime = file_path.stat().st_mtime
-            created_at = datetime.fromtimestamp(mtime)
-
-            photo = Photo(
-                filename=new_filename,
-                uploader_id=uploader_id,
-                status=PhotoStatus.APPROVED,
-                created_at=created_at
-            )
-            db.add(photo)
-            count += 1
-            print(f"Imported {file_path.name} -> {new_filename}")
-
-        db.commit()
-        print(f"Successfully imported {count} photos.")
+        rendered = thumbnails.generate_variants(target_dir / filename for filename in report.new_files)
+        thumbnails.shutdown()
+        print(f"Rendered {rendered} image variants.")
 
     except Exception as e:
         print(f"Error: {e}")
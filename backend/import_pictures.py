@@ -2,17 +2,19 @@
 Import pictures from Picture/ folder to database and uploads/ folder.
 This script runs during deployment to restore photos.
 """
+import argparse
 import os
-import shutil
 from pathlib import Path
-from datetime import datetime
+from typing import Optional
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models.photo import Photo, PhotoStatus
 from app.models.user import User
 from app.db.base import Base
+from app.services import thumbnails
+from app.services.photo_import import DEFAULT_WORKERS, import_directory
 
-def import_pictures():
+def import_pictures(workers: int = DEFAULT_WORKERS, manifest_path: Optional[Path] = None):
     """Import all pictures from Picture/ folder."""
     
     # Get database URL
@@ -59,59 +61,27 @@ def import_pictures():
         print(f"Picture directory: {picture_dir.absolute()}")
         print(f"Uploads directory: {uploads_dir.absolute()}")
         
-        # Import each picture
-        imported_count = 0
-        skipped_count = 0
+        # Hash, link / copy in parallel and bulk insert the new rows
+        report = import_directory(
+            db,
+            picture_dir,
+            uploads_dir,
+            uploader_id=admin.id,
+            workers=workers,
+            manifest_path=manifest_path
+        )
         
-        for file_path in picture_dir.iterdir():
-            if not file_path.is_file():
-                continue
-            
-            # Check file extension
-            ext = file_path.suffix.lower()
-            if ext not in ['.jpg', '.jpeg', '.png', '.webp']:
-                print(f"Skipping non-image file: {file_path.name}")
-                continue
-            
-            filename = file_path.name
-            
-            # Check if already in database
-            existing = db.query(Photo).filter(Photo.filename == filename).first()
-            if existing:
-                print(f"Skipping existing photo: {filename}")
-                skipped_count += 1
-                
-                # Ensure file exists in uploads/
-                dest_path = uploads_dir / filename
-                if not dest_path.exists():
-                    shutil.copy2(file_path, dest_path)
-                    print(f"  → Restored file to uploads/")
-                continue
-            
-            # Copy file to uploads/
-            dest_path = uploads_dir / filename
-            shutil.copy2(file_path, dest_path)
-            
-            # Create database record
-            photo = Photo(
-                filename=filename,
-                uploader_id=admin.id,
-                status=PhotoStatus.APPROVED,
-                created_at=datetime.utcnow(),
-                reviewed_at=datetime.utcnow(),
-                reviewed_by=admin.id
-            )
-            db.add(photo)
-            
-            print(f"Imported: {filename}")
-            imported_count += 1
-        
-        # Commit all changes
-        db.commit()
+        # Pre-render gallery thumbnails for everything in the store
+        rendered = thumbnails.generate_variants(
+            uploads_dir / filename
+            for (filename,) in db.query(Photo.filename).filter(Photo.status == PhotoStatus.APPROVED)
+            if (uploads_dir / filename).exists()
+        )
+        thumbnails.shutdown()
+        print(f"  Rendered {rendered} image variants")
         
         print(f"\n✓ Import completed!")
-        print(f"  Imported: {imported_count} photos")
-        print(f"  Skipped: {skipped_count} photos (already in database)")
+        print(f"  {report.summary()}")
         
     except Exception as e:
         print(f"Error during import: {e}")
@@ -121,4 +91,8 @@ def import_pictures():
         db.close()
 
 if __name__ == "__main__":
-    import_pictures()
+    parser = argparse.ArgumentParser(description="Import Picture/ into uploads/ and the photos table")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="parallel hash / copy threads")
+    parser.add_argument("--manifest", type=Path, default=None, help="resume manifest (default: uploads/.import-manifest.jsonl)")
+    args = parser.parse_args()
+    import_pictures(workers=args.workers, manifest_path=args.manifest)
@@ -1,5 +1,6 @@
 import sys
 import os
+from pathlib import Path
 from sqlalchemy import text
 
 # Add the parent directory to sys.path
@@ -9,6 +10,7 @@ from app.db.session import engine, SessionLocal
 from app.models.user import User
 from app.models.photo import Photo
 from app.core.config import settings
+from app.services.blob_store import hash_file
 
 def migrate():
     print("Starting database migration...")
@@ -50,6 +52,30 @@ def migrate():
         except Exception as e:
             print(f"Note: {e}")
 
+    # Check and add photos.content_hash
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(text("SELECT content_hash FROM photos LIMIT 1"))
+            print("✓ 'content_hash' column already exists")
+    except Exception:
+        print("Adding 'content_hash' column...")
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("ALTER TABLE photos ADD COLUMN content_hash VARCHAR(64)"))
+            print("✓ Added 'content_hash' column")
+        except Exception as e:
+            print(f"Note: {e}")
+    
+    # create_all skips indexes on tables that already exist, so add them explicitly
+    from app.db.base import Base
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                print(f"Note: {e}")
+    print("✓ Created missing indexes")
+
     # 3. Backfill receiver_id for existing messages
     print("Backfilling receiver_id...")
     db = SessionLocal()
@@ -87,6 +113,34 @@ def migrate():
     finally:
         db.close()
         
+    # 4. Backfill content_hash for photos stored before content addressing
+    print("Backfilling photo content hashes...")
+    uploads_dir = Path("uploads")
+    if not uploads_dir.exists():
+        uploads_dir = Path("backend/uploads")
+    db = SessionLocal()
+    try:
+        known = {h for (h,) in db.query(Photo.content_hash).filter(Photo.content_hash != None)}
+        backfilled = 0
+        for photo in db.query(Photo).filter(Photo.content_hash == None).all():
+            file_path = uploads_dir / photo.filename
+            if not file_path.exists():
+                continue
+            digest = hash_file(file_path)
+            # Leave byte-identical legacy duplicates unhashed (unique index)
+            if digest in known:
+                continue
+            photo.content_hash = digest
+            known.add(digest)
+            backfilled += 1
+        db.commit()
+        print(f"✓ Backfilled content_hash for {backfilled} photos")
+    except Exception as e:
+        print(f"Note during hash backfill: {e}")
+        db.rollback()
+    finally:
+        db.close()
+        
     print("Migration completed!")
 
 if __name__ == "__main__":
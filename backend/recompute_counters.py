@@ -0,0 +1,29 @@
+"""
+Rebuild the stats counters from the source tables.
+Run this if unread counts or dashboard totals ever drift.
+"""
+import os
+import sys
+
+# Add backend to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.base import Base
+from app.db.session import engine, SessionLocal
+from app.services.counters import recompute_counters
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        values = recompute_counters(db)
+        for key in sorted(values):
+            print(f"  {key} = {values[key]}")
+        print(f"✓ Recomputed {len(values)} counters")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
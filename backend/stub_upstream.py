@@ -0,0 +1,83 @@
+"""
+Local stub of the external (OpenAI-compatible) chat completions API.
+Use it to exercise retries, the circuit breaker and streaming without
+spending on the real upstream:
+
+    python stub_upstream.py --port 9100 --fail-rate 0.3 --latency 0.5
+    EXTERNAL_API_URL=http://127.0.0.1:9100/v1/chat/completions uvicorn app.main:app
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(args):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, payload: dict, headers: dict = None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt = request.get("messages", [{}])[-1].get("content", "")
+            time.sleep(args.latency)
+
+            if args.down or random.random() < args.fail_rate:
+                headers = {"Retry-After": str(args.retry_after)} if args.retry_after is not None else {}
+                self._send_json(args.fail_status, {"error": "stub failure"}, headers)
+                return
+
+            answer = f"Stub answer to: {prompt}"
+            if not request.get("stream"):
+                self._send_json(200, {"choices": [{"message": {"role": "assistant", "content": answer}}]})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for word in answer.split(" "):
+                chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(args.token_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def log_message(self, format, *a):
+            print(f"stub: {self.command} {self.path} -> {format % a}")
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub external API for local testing")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before answering")
+    parser.add_argument("--token-delay", type=float, default=0.05, help="seconds between streamed chunks")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=int, default=None, help="Retry-After seconds on failures")
+    parser.add_argument("--down", action="store_true", help="fail every request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args))
+    print(f"Stub upstream listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+Test configuration. Settings are read when app modules are imported, so the
+environment is set up here before anything from app/ is imported: the app
+runs against a shared-cache in-memory SQLite database (reachable from both
+the sync and the async engine) and never calls a real upstream.
+"""
+import os
+
+os.environ["DATABASE_URL"] = "sqlite:///file:testdb?mode=memory&cache=shared&uri=true"
+os.environ.setdefault("ADMIN_PASSWORD", "admin-test")
+os.environ.setdefault("FRIEND_PASSWORD", "friend-test")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ["REQUEST_LOG_ENABLED"] = "false"
+os.environ["EXTERNAL_CACHE_BACKEND"] = "none"
@@ -0,0 +1,86 @@
+"""
+AuditWriter failure handling: transient DB errors are retried, a row the
+database rejects is dropped on its own instead of taking the batch with it.
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.core import audit
+from app.core.audit import AuditWriter, _entry
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.audit_log import AuditLog
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(audit.time, "sleep", lambda delay: None)
+    yield AuditWriter(flush_size=10, flush_interval=0.01, retry_attempts=3, retry_base=0.01)
+    Base.metadata.drop_all(bind=engine)
+
+
+def written_ids():
+    db = SessionLocal()
+    try:
+        return sorted(db.scalars(select(AuditLog.resource_id)).all())
+    finally:
+        db.close()
+
+
+def entries(count):
+    return [_entry(1, "TODO_CREATE", "todo", str(i), None) for i in range(count)]
+
+
+def test_bad_row_does_not_drop_the_batch(writer):
+    batch = entries(4)
+    batch[2]["user_id"] = None  # NOT NULL violation
+
+    writer._write(batch)
+
+    assert written_ids() == ["0", "1", "3"]
+    assert writer.dropped == 1
+
+
+def test_transient_error_is_retried(writer, monkeypatch):
+    real_insert = writer._insert
+    failures = [OperationalError("INSERT", {}, Exception("database is locked"))] * 2
+
+    def flaky_insert(batch):
+        if failures:
+            raise failures.pop()
+        real_insert(batch)
+
+    monkeypatch.setattr(writer, "_insert", flaky_insert)
+    writer._write(entries(3))
+
+    assert written_ids() == ["0", "1", "2"]
+    assert writer.dropped == 0
+
+
+def test_gives_up_after_bounded_attempts(writer, monkeypatch):
+    calls = []
+
+    def down(batch):
+        calls.append(len(batch))
+        raise OperationalError("INSERT", {}, Exception("connection refused"))
+
+    monkeypatch.setattr(writer, "_insert", down)
+    writer._write(entries(3))
+
+    assert calls == [3, 3, 3]
+    assert writer.dropped == 3
+
+
+def test_stop_drains_queue_past_a_bad_row(writer):
+    writer.start()
+    for entry in entries(3):
+        writer.enqueue(entry)
+    bad = _entry(1, "TODO_CREATE", "todo", "bad", None)
+    bad["user_id"] = None
+    writer.enqueue(bad)
+    writer.stop()
+
+    assert written_ids() == ["0", "1", "2"]
+    assert writer.dropped == 1
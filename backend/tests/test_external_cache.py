@@ -0,0 +1,49 @@
+"""
+A failing cache backend degrades to a bypass instead of failing the call.
+"""
+import asyncio
+import sqlite3
+
+from app.services.external_cache import CACHE_BYPASS, CACHE_MISS, ExternalResponseCache, MemoryCacheBackend
+
+RAW = {"choices": [{"message": {"role": "assistant", "content": "hi"}}]}
+
+
+class BrokenWrites(MemoryCacheBackend):
+    def set(self, key, value):
+        raise sqlite3.OperationalError("database is locked")
+
+
+class BrokenReads(MemoryCacheBackend):
+    def get(self, key):
+        raise sqlite3.DatabaseError("file is not a database")
+
+
+def fetcher(calls):
+    async def fetch():
+        calls.append(1)
+        return RAW
+    return fetch
+
+
+def test_failed_store_still_returns_upstream_response():
+    cache = ExternalResponseCache(BrokenWrites(max_size=10, ttl_seconds=60))
+    calls = []
+
+    raw, status = asyncio.run(cache.get_or_fetch("hello", fetcher(calls)))
+
+    assert raw == RAW
+    assert status == CACHE_MISS
+    assert calls == [1]
+    assert cache.errors == 1
+
+
+def test_failed_read_bypasses_cache():
+    cache = ExternalResponseCache(BrokenReads(max_size=10, ttl_seconds=60))
+    calls = []
+
+    raw, status = asyncio.run(cache.get_or_fetch("hello", fetcher(calls)))
+    assert (raw, status) == (RAW, CACHE_BYPASS)
+    assert asyncio.run(cache.lookup("hello")) is None
+    assert cache.errors == 2
+    assert cache.hits == cache.misses == 0
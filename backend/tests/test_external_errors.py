@@ -0,0 +1,121 @@
+"""
+Error handling of the external endpoints: errors raised after the rate-limit
+check still carry the RateLimit-* headers, and cache failures are not
+upstream failures.
+"""
+import sqlite3
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import clear_auth_cache, create_access_token
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.user import User
+from app.routers import external
+from app.services.external_cache import ExternalResponseCache, MemoryCacheBackend
+from app.services.resilience import CIRCUIT_CLOSED, CircuitBreaker, CircuitOpenError, ExternalGuard
+
+RATE_LIMIT_HEADERS = ("RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy")
+
+
+@pytest.fixture(scope="module")
+def headers():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(username="ext-friend", hashed_password="x", role="FRIEND")
+        db.add(user)
+        db.commit()
+        token = create_access_token({"sub": str(user.id)})
+    finally:
+        db.close()
+    yield {"Authorization": f"Bearer {token}"}
+    clear_auth_cache()
+    Base.metadata.drop_all(bind=engine)
+
+
+def fail_with(error):
+    async def call(prompt):
+        raise error
+    return call
+
+
+def assert_rate_limit_headers(response):
+    for name in RATE_LIMIT_HEADERS:
+        assert name in response.headers
+
+
+def test_upstream_failure_keeps_rate_limit_headers(headers, monkeypatch):
+    monkeypatch.setattr(external, "call_external_api", fail_with(httpx.ConnectError("refused")))
+
+    response = TestClient(app).post("/external/call", json={"prompt": "hi"}, headers=headers)
+
+    assert response.status_code == 502
+    assert_rate_limit_headers(response)
+
+
+def test_rejected_call_keeps_rate_limit_headers(headers, monkeypatch):
+    monkeypatch.setattr(external, "call_external_api", fail_with(CircuitOpenError("circuit open", 7)))
+
+    response = TestClient(app).post("/external/call", json={"prompt": "hi"}, headers=headers)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert_rate_limit_headers(response)
+
+
+def test_stream_connect_failure_keeps_rate_limit_headers(headers, monkeypatch):
+    class Refused:
+        async def __aenter__(self):
+            raise httpx.ConnectError("refused")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(external, "open_external_stream", lambda prompt: Refused())
+
+    response = TestClient(app).post("/external/call/stream", json={"prompt": "hi"}, headers=headers)
+
+    assert response.status_code == 502
+    assert_rate_limit_headers(response)
+
+
+def test_stream_cache_failure_is_not_an_upstream_error(headers, monkeypatch):
+    class Upstream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+    async def chunks(upstream):
+        for text in ("hel", "lo"):
+            yield text
+
+    class BrokenWrites(MemoryCacheBackend):
+        def set(self, key, value):
+            raise sqlite3.OperationalError("database is locked")
+
+    guard = ExternalGuard(
+        max_in_flight=4, queue_timeout=1.0, retry_attempts=1, retry_base=0.01, retry_max=1.0,
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    )
+    cache = ExternalResponseCache(BrokenWrites(max_size=10, ttl_seconds=60))
+    monkeypatch.setattr(external, "open_external_stream", lambda prompt: Upstream())
+    monkeypatch.setattr(external, "iter_stream_text", chunks)
+    monkeypatch.setattr(external, "external_guard", guard)
+    monkeypatch.setattr(external, "external_cache", cache)
+
+    response = TestClient(app).post("/external/call/stream", json={"prompt": "hi"}, headers=headers)
+
+    assert response.status_code == 200
+    assert "event: done" in response.text
+    assert "event: error" not in response.text
+    assert cache.errors == 1
+    assert guard.breaker.state == CIRCUIT_CLOSED
@@ -0,0 +1,95 @@
+"""
+Statement counts of the paginated listings must not grow with the page size
+(no per-row user lookups).
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.security import clear_auth_cache, create_access_token
+from app.db.base import Base
+from app.db.session import SessionLocal, async_engine, engine
+from app.main import app
+from app.models.audit_log import AuditLog
+from app.models.message import Message
+from app.models.user import User
+
+N = 5
+
+
+@pytest.fixture(scope="module")
+def admin_headers():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        admin = User(username="qc-admin", hashed_password="x", role="ADMIN")
+        friend = User(username="qc-friend", hashed_password="x", role="FRIEND")
+        db.add_all([admin, friend])
+        db.flush()
+        start = datetime.utcnow() - timedelta(hours=1)
+        # Alternate senders so every page mixes users
+        for i in range(10 * N + 1):
+            sender, receiver = (admin, friend) if i % 2 else (friend, admin)
+            db.add(Message(
+                sender_id=sender.id, receiver_id=receiver.id,
+                content=f"message {i}", created_at=start + timedelta(seconds=i)
+            ))
+            db.add(AuditLog(
+                user_id=sender.id, action="MESSAGE_CREATE", resource_type="message",
+                resource_id=str(i), created_at=start + timedelta(seconds=i)
+            ))
+        db.commit()
+        token = create_access_token({"sub": str(admin.id)})
+    finally:
+        db.close()
+    yield {"Authorization": f"Bearer {token}"}
+    # Later modules reuse the user ids (and, within the same second, the tokens)
+    clear_auth_cache()
+    Base.metadata.drop_all(bind=engine)
+
+
+@contextmanager
+def count_statements():
+    counter = {"statements": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+
+    targets = [engine, async_engine.sync_engine]
+    for target in targets:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def statements_for(client: TestClient, path: str, limit: int, headers: dict) -> int:
+    # Same auth lookup for every request: start from an empty token cache
+    clear_auth_cache()
+    with count_statements() as counter:
+        response = client.get(path, params={"limit": limit}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == limit
+    return counter["statements"]
+
+
+@pytest.mark.parametrize("path", ["/messages", "/admin/friend/messages", "/admin/audit"])
+def test_statement_count_is_flat_across_page_sizes(path, admin_headers):
+    client = TestClient(app)
+    small = statements_for(client, path, N, admin_headers)
+    large = statements_for(client, path, 10 * N, admin_headers)
+    assert small == large, (small, large)
+    # Auth lookup + the listing itself, however the session batches them
+    assert large <= 3
+
+
+@pytest.mark.parametrize("path", ["/messages", "/admin/friend/messages", "/admin/audit"])
+def test_listing_includes_usernames(path, admin_headers):
+    response = TestClient(app).get(path, params={"limit": N}, headers=admin_headers)
+    key = "username" if path == "/admin/audit" else "sender_username"
+    assert {row[key] for row in response.json()} == {"qc-admin", "qc-friend"}
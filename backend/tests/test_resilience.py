@@ -0,0 +1,201 @@
+"""
+ExternalGuard / CircuitBreaker behaviour against a scripted upstream
+(httpx.MockTransport), without touching the real external API.
+"""
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import resilience
+from app.services.resilience import (
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN,
+    CircuitBreaker, CircuitOpenError, ExternalGuard, UpstreamBusyError
+)
+
+URL = "http://upstream.test/v1/chat/completions"
+
+
+class ScriptedUpstream:
+    """Answers each request with the next (status, headers) from the script; 200 when exhausted."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self.release = None
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        status, headers = self.script.pop(0) if self.script else (200, {})
+        return httpx.Response(status, headers=headers, json={"ok": status == 200})
+
+    def attempt(self, client: httpx.AsyncClient):
+        async def call():
+            response = await client.post(URL, json={})
+            response.raise_for_status()
+            return response.json()
+        return call
+
+
+def make_guard(**overrides) -> ExternalGuard:
+    options = dict(
+        max_in_flight=4, queue_timeout=1.0, retry_attempts=3, retry_base=0.01, retry_max=2.0,
+        failure_threshold=3, reset_timeout=30.0
+    )
+    options.update(overrides)
+    breaker = CircuitBreaker(options.pop("failure_threshold"), options.pop("reset_timeout"))
+    return ExternalGuard(breaker=breaker, **options)
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> List[float]:
+    """Record backoff delays instead of sleeping through them."""
+    recorded = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        recorded.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retries_transient_status_honoring_retry_after(status, sleeps):
+    async def scenario():
+        upstream = ScriptedUpstream((status, {"Retry-After": "1"}))
+        guard = make_guard()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler)) as client:
+            result = await guard.call(upstream.attempt(client))
+        return upstream, guard, result
+
+    upstream, guard, result = asyncio.run(scenario())
+    assert result == {"ok": True}
+    assert upstream.calls == 2
+    assert guard.retries == 1
+    # Waited at least as long as the upstream asked
+    assert len(sleeps) == 1 and sleeps[0] >= 1.0
+
+
+def test_gives_up_when_retry_after_exceeds_retry_max(sleeps):
+    async def scenario():
+        upstream = ScriptedUpstream((503, {"Retry-After": "60"}))
+        guard = make_guard(retry_max=2.0)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler)) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await guard.call(upstream.attempt(client))
+        return upstream, guard, None
+
+    upstream, guard, _ = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert guard.retries == 0
+    assert sleeps == []
+
+
+def test_client_errors_are_not_retried(sleeps):
+    async def scenario():
+        upstream = ScriptedUpstream((400, {}))
+        guard = make_guard()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler)) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await guard.call(upstream.attempt(client))
+        return upstream, guard, None
+
+    upstream, guard, _ = asyncio.run(scenario())
+    assert upstream.calls == 1
+    # A 4xx proves the upstream is up: no breaker failure
+    assert guard.breaker.consecutive_failures == 0
+
+
+def test_queue_timeout_rejects_with_busy_error():
+    async def scenario():
+        upstream = ScriptedUpstream()
+        upstream.release = asyncio.Event()
+        guard = make_guard(max_in_flight=1, queue_timeout=0.05)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler)) as client:
+            holder = asyncio.create_task(guard.call(upstream.attempt(client)))
+            await asyncio.sleep(0.01)
+            with pytest.raises(UpstreamBusyError) as excinfo:
+                await guard.call(upstream.attempt(client))
+            upstream.release.set()
+            await holder
+        assert excinfo.value.retry_after == pytest.approx(0.05)
+        return upstream, guard, None
+
+    upstream, guard, _ = asyncio.run(scenario())
+    assert guard.queue_timeouts == 1
+    # The rejected call never reached the upstream
+    assert upstream.calls == 1
+
+
+def test_breaker_opens_then_single_probe_closes_it():
+    async def scenario():
+        upstream = ScriptedUpstream((500, {}), (500, {}))
+        guard = make_guard(retry_attempts=1, failure_threshold=2, reset_timeout=0.05)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler)) as client:
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await guard.call(upstream.attempt(client))
+            assert guard.breaker.state == CIRCUIT_OPEN
+
+            # Open: fails fast without calling the upstream
+            with pytest.raises(CircuitOpenError):
+                await guard.call(upstream.attempt(client))
+            assert upstream.calls == 2
+
+            await asyncio.sleep(0.06)
+            assert guard.breaker.stats()["state"] == CIRCUIT_HALF_OPEN
+
+            # Half-open: one probe goes through, concurrent calls are still rejected
+            upstream.release = asyncio.Event()
+            probe = asyncio.create_task(guard.call(upstream.attempt(client)))
+            await asyncio.sleep(0.01)
+            with pytest.raises(CircuitOpenError):
+                await guard.call(upstream.attempt(client))
+            upstream.release.set()
+            result = await probe
+        return upstream, guard, result
+
+    upstream, guard, result = asyncio.run(scenario())
+    assert result == {"ok": True}
+    assert upstream.calls == 3
+    assert guard.breaker.state == CIRCUIT_CLOSED
+    assert guard.breaker.rejected == 2
+
+
+def test_failed_probe_reopens_the_circuit():
+    async def scenario():
+        upstream = ScriptedUpstream((503, {}), (503, {}))
+        guard = make_guard(retry_attempts=1, failure_threshold=1, reset_timeout=0.05)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler)) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await guard.call(upstream.attempt(client))
+            await asyncio.sleep(0.06)
+            with pytest.raises(httpx.HTTPStatusError):
+                await guard.call(upstream.attempt(client))
+        return upstream, guard, None
+
+    upstream, guard, _ = asyncio.run(scenario())
+    assert guard.breaker.state == CIRCUIT_OPEN
+    assert not guard.breaker.probe_in_flight
+
+
+def test_public_health_exposes_only_circuit_state(monkeypatch):
+    guard = make_guard(failure_threshold=1)
+    monkeypatch.setattr("app.routers.external.external_guard", guard)
+    client = TestClient(app)
+
+    response = client.get("/external/health")
+    assert response.status_code == 200
+    assert response.json() == {"circuit": CIRCUIT_CLOSED}
+
+    guard.breaker.record_failure()
+    response = client.get("/external/health")
+    assert response.status_code == 503
+    assert set(response.json()) == {"circuit", "retry_after_seconds"}
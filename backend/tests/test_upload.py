@@ -0,0 +1,54 @@
+"""
+Malformed multipart bodies are rejected with 400 and leave no temp files.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import clear_auth_cache, create_access_token
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.user import User
+from app.services.blob_store import UPLOAD_DIR
+
+MULTIPART = "multipart/form-data; boundary=zz"
+
+
+@pytest.fixture(scope="module")
+def headers():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(username="upload-friend", hashed_password="x", role="FRIEND")
+        db.add(user)
+        db.commit()
+        token = create_access_token({"sub": str(user.id)})
+    finally:
+        db.close()
+    yield {"Authorization": f"Bearer {token}", "Content-Type": MULTIPART}
+    clear_auth_cache()
+    Base.metadata.drop_all(bind=engine)
+
+
+def part_files():
+    return set(UPLOAD_DIR.glob("*.part"))
+
+
+def file_part_then_bad_header():
+    # First chunk starts the file part (temp file created), the second breaks the parser
+    yield b'--zz\r\nContent-Disposition: form-data; name="file"; filename="a.jpg"\r\n\r\njpeg bytes'
+    yield b"\r\n--zz\r\nbad header line\r\n\r\n"
+
+
+@pytest.mark.parametrize("body", [
+    lambda: b"this is not a multipart body",
+    file_part_then_bad_header,
+], ids=["garbage", "broken-after-file-part"])
+def test_malformed_multipart_is_rejected(headers, body):
+    before = part_files()
+
+    response = TestClient(app).post("/photos/upload", content=body(), headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Malformed multipart body"
+    assert part_files() == before
@@ -1,4 +1,4 @@
-import { apiClient } from './client';
+import { apiClient, getAllPages, getPage, Page } from './client';
 import { Todo } from './todos';
 import { Message } from './messages';
 
@@ -39,15 +39,23 @@ export const adminApi = {
     start_date?: string;
     end_date?: string;
     limit?: number;
-    offset?: number;
   }): Promise<AuditLog[]> => {
-    const response = await apiClient.get<AuditLog[]>('/admin/audit', { params });
-    return response.data;
+    const page = await getPage<AuditLog>('/admin/audit', params);
+    return page.items;
+  },
+
+  getAuditLogPage: async (params?: {
+    action?: string;
+    start_date?: string;
+    end_date?: string;
+    limit?: number;
+    cursor?: string;
+  }): Promise<Page<AuditLog>> => {
+    return getPage<AuditLog>('/admin/audit', params);
   },
 
   getFriendTodos: async (): Promise<Todo[]> => {
-    const response = await apiClient.get<Todo[]>('/admin/friend/todos');
-    return response.data;
+    return getAllPages<Todo>('/admin/friend/todos');
   },
 
   deleteFriendTodo: async (id: number): Promise<void> => {
@@ -55,7 +63,10 @@ export const adminApi = {
   },
 
   getFriendMessages: async (): Promise<Message[]> => {
-    const response = await apiClient.get<Message[]>('/admin/friend/messages');
-    return response.data;
+    return getAllPages<Message>('/admin/friend/messages');
+  },
+
+  getFriendMessagesPage: async (limit = 100, cursor?: string): Promise<Page<Message>> => {
+    return getPage<Message>('/admin/friend/messages', { limit, cursor });
   },
 };
@@ -5,7 +5,7 @@ if (apiUrl && !apiUrl.startsWith('http')) {
   apiUrl = `https://${apiUrl}`;
 }
 
-const API_BASE_URL = apiUrl;
+export const API_BASE_URL = apiUrl;
 
 export const apiClient = axios.create({
   baseURL: API_BASE_URL,
@@ -52,3 +52,30 @@ apiClient.interceptors.response.use(
     return Promise.reject(error);
   }
 );
+
+// Keyset pagination: list endpoints return the next page's cursor in this header
+const NEXT_CURSOR_HEADER = 'x-next-cursor';
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export const getPage = async <T>(url: string, params?: Record<string, any>): Promise<Page<T>> => {
+  const response = await apiClient.get<T[]>(url, { params });
+  return {
+    items: response.data,
+    nextCursor: response.headers[NEXT_CURSOR_HEADER] || null,
+  };
+};
+
+export const getAllPages = async <T>(url: string, params?: Record<string, any>): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const page: Page<T> = await getPage<T>(url, cursor ? { ...params, cursor } : params);
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+};
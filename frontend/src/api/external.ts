@@ -1,4 +1,4 @@
-import { apiClient } from './client';
+import { API_BASE_URL, apiClient } from './client';
 
 export interface ExternalApiRequest {
   prompt: string;
@@ -9,9 +9,70 @@ export interface ExternalApiResponse {
   raw: any;
 }
 
+export interface ExternalStreamHandlers {
+  onDelta: (text: string) => void;
+}
+
+export class ExternalStreamError extends Error {
+  status?: number;
+  retryAfter?: number;
+
+  constructor(message: string, status?: number, retryAfter?: number) {
+    super(message);
+    this.status = status;
+    this.retryAfter = retryAfter;
+  }
+}
+
 export const externalApi = {
   call: async (data: ExternalApiRequest): Promise<ExternalApiResponse> => {
     const response = await apiClient.post<ExternalApiResponse>('/external/call', data);
     return response.data;
   },
+
+  // Server-Sent Events over a POST body, so EventSource can't be used
+  stream: async (data: ExternalApiRequest, handlers: ExternalStreamHandlers): Promise<string> => {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${API_BASE_URL}/external/call/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${token}`,
+      },
+      body: JSON.stringify(data),
+    });
+    if (!response.ok || !response.body) {
+      const body = await response.json().catch(() => ({}));
+      const retryAfter = Number(response.headers.get('Retry-After')) || undefined;
+      throw new ExternalStreamError(body.detail || '调用失败', response.status, retryAfter);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        const event = frame.match(/^event: (.*)$/m)?.[1];
+        const payload = frame.match(/^data: (.*)$/m)?.[1];
+        if (!event || !payload) continue;
+        const parsed = JSON.parse(payload);
+        if (event === 'delta') {
+          text += parsed.text;
+          handlers.onDelta(parsed.text);
+        } else if (event === 'error') {
+          throw new ExternalStreamError(parsed.detail);
+        }
+      }
+    }
+    return text;
+  },
 };
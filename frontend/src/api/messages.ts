@@ -1,4 +1,4 @@
-import { apiClient } from './client';
+import { apiClient, API_BASE_URL, getPage, Page } from './client';
 
 export interface Message {
   id: number;
@@ -12,12 +12,54 @@ export interface MessageCreate {
   content: string;
 }
 
+export interface MessageStreamHandlers {
+  onMessageCreated?: (message: Message) => void;
+  onMessageDeleted?: (id: number) => void;
+  onMessagesRead?: (ids: number[]) => void;
+  onUnread?: (unread: number) => void;
+  // false when the EventSource errors (it retries on its own), true once (re)connected
+  onConnectionChange?: (connected: boolean) => void;
+}
+
+// One EventSource per tab, shared by every subscriber (Layout badge + messages page)
+const streamListeners = new Set<MessageStreamHandlers>();
+let streamSource: EventSource | null = null;
+
+function openStream(): EventSource {
+  const token = localStorage.getItem('token');
+  const source = new EventSource(`${API_BASE_URL}/messages/stream?token=${token}`);
+  const each = (fn: (handlers: MessageStreamHandlers) => void) => streamListeners.forEach(fn);
+  const data = (e: Event) => JSON.parse((e as MessageEvent).data);
+
+  source.addEventListener('open', () => each((h) => h.onConnectionChange?.(true)));
+  source.addEventListener('error', () => each((h) => h.onConnectionChange?.(false)));
+  source.addEventListener('message_created', (e) => {
+    const message = data(e);
+    each((h) => h.onMessageCreated?.(message));
+  });
+  source.addEventListener('message_deleted', (e) => {
+    const { id } = data(e);
+    each((h) => h.onMessageDeleted?.(id));
+  });
+  source.addEventListener('messages_read', (e) => {
+    const { ids } = data(e);
+    each((h) => h.onMessagesRead?.(ids));
+  });
+  source.addEventListener('unread', (e) => {
+    const { unread } = data(e);
+    each((h) => h.onUnread?.(unread));
+  });
+  return source;
+}
+
 export const messagesApi = {
-  list: async (limit = 100, offset = 0): Promise<Message[]> => {
-    const response = await apiClient.get<Message[]>('/messages', {
-      params: { limit, offset },
-    });
-    return response.data;
+  list: async (limit = 100): Promise<Message[]> => {
+    const page = await getPage<Message>('/messages', { limit });
+    return page.items;
+  },
+
+  listPage: async (limit = 100, cursor?: string): Promise<Page<Message>> => {
+    return getPage<Message>('/messages', { limit, cursor });
   },
 
   create: async (data: MessageCreate): Promise<Message> => {
@@ -34,7 +76,25 @@ export const messagesApi = {
     return response.data;
   },
 
-  markRead: async (): Promise<void> => {
-    await apiClient.post('/messages/mark_read');
+  markRead: async (params?: { up_to_id?: number; before?: string }): Promise<void> => {
+    await apiClient.post('/messages/mark_read', null, { params });
+  },
+
+  // Server-pushed events; returns a function that unsubscribes (the last one closes the stream)
+  subscribe: (handlers: MessageStreamHandlers): (() => void) => {
+    streamListeners.add(handlers);
+    if (!streamSource || streamSource.readyState === EventSource.CLOSED) {
+      streamSource?.close();
+      streamSource = openStream();
+    } else if (streamSource.readyState === EventSource.OPEN) {
+      handlers.onConnectionChange?.(true);
+    }
+    return () => {
+      streamListeners.delete(handlers);
+      if (streamListeners.size === 0 && streamSource) {
+        streamSource.close();
+        streamSource = null;
+      }
+    };
   },
 };
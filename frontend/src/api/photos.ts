@@ -1,12 +1,25 @@
-import { apiClient } from './client';
+import { API_BASE_URL, apiClient, getAllPages, getPage, Page } from './client';
+
+export type ImageSize = 'original' | 'medium' | 'thumb';
 
 export interface Photo {
   id: number;
   filename: string;
   created_at: string;
   uploader_id?: number;
+  // Signed, expiring /media URLs issued by the list endpoints
+  urls?: Record<ImageSize, string>;
 }
 
+// Absolute URL for a signed media path, or undefined if none was issued
+export const signedMediaUrl = (
+  urls: Partial<Record<ImageSize, string>> | undefined,
+  size: ImageSize,
+): string | undefined => {
+  const path = urls?.[size];
+  return path ? `${API_BASE_URL}${path}` : undefined;
+};
+
 export const photosApi = {
   upload: async (file: File): Promise<{ id: number; status: string; filename: string }> => {
     const formData = new FormData();
@@ -20,8 +33,11 @@ export const photosApi = {
   },
 
   list: async (): Promise<Photo[]> => {
-    const response = await apiClient.get<Photo[]>('/photos');
-    return response.data;
+    return getAllPages<Photo>('/photos');
+  },
+
+  listPage: async (limit = 100, cursor?: string): Promise<Page<Photo>> => {
+    return getPage<Photo>('/photos', { limit, cursor });
   },
 
   // Admin endpoints
@@ -1,10 +1,12 @@
 import { apiClient } from './client';
+import { ImageSize, signedMediaUrl } from './photos';
 
 export interface PictureInfo {
   name: string;
   size: number;
   content_type: string;
   created_at?: number;
+  urls?: Record<ImageSize, string>;
 }
 
 export const picturesApi = {
@@ -13,9 +15,11 @@ export const picturesApi = {
     return response.data;
   },
 
-  getUrl: (filename: string): string => {
+  getUrl: (filename: string, size: ImageSize = 'original', urls?: Record<ImageSize, string>): string => {
+    const signed = signedMediaUrl(urls, size);
+    if (signed) return signed;
     const baseUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
     const token = localStorage.getItem('token');
-    return `${baseUrl}/pictures/${filename}?token=${token}`;
+    return `${baseUrl}/pictures/${filename}?token=${token}&size=${size}`;
   },
 };
@@ -1,4 +1,4 @@
-import { apiClient } from './client';
+import { apiClient, getAllPages, getPage, Page } from './client';
 
 export interface Todo {
   id: number;
@@ -21,8 +21,11 @@ export interface TodoUpdate {
 export const todosApi = {
   list: async (done?: number): Promise<Todo[]> => {
     const params = done !== undefined ? { done } : {};
-    const response = await apiClient.get<Todo[]>('/todos', { params });
-    return response.data;
+    return getAllPages<Todo>('/todos', params);
+  },
+
+  listPage: async (done?: number, limit = 100, cursor?: string): Promise<Page<Todo>> => {
+    return getPage<Todo>('/todos', { done, limit, cursor });
   },
 
   create: async (data: TodoCreate): Promise<Todo> => {
@@ -14,30 +14,49 @@ export default function Layout({ children, role }: LayoutProps) {
   const [showToast, setShowToast] = useState(false);
   const prevUnreadRef = useRef(0);
 
-  // Polling for unread messages
+  // Unread badge from the message event stream; polls only while the stream is down
   useEffect(() => {
+    let pollTimer: number | undefined;
+
+    const applyUnread = (count: number) => {
+      if (count > prevUnreadRef.current && count > 0) {
+        setShowToast(true);
+        setTimeout(() => setShowToast(false), 3000);
+      }
+      setUnreadCount(count);
+      prevUnreadRef.current = count;
+    };
+
     const checkUnread = async () => {
       try {
         const data = await messagesApi.getUnreadCount();
-        const count = data.unread;
-        
-        if (count > prevUnreadRef.current && count > 0) {
-          setShowToast(true);
-          setTimeout(() => setShowToast(false), 3000);
-        }
-        
-        setUnreadCount(count);
-        prevUnreadRef.current = count;
+        applyUnread(data.unread);
       } catch (error) {
         console.error("Polling error", error);
       }
     };
 
-    // Initial check
-    checkUnread();
+    const startPolling = () => {
+      if (pollTimer !== undefined) return;
+      checkUnread();
+      pollTimer = window.setInterval(checkUnread, 8000);
+    };
+
+    const stopPolling = () => {
+      if (pollTimer === undefined) return;
+      clearInterval(pollTimer);
+      pollTimer = undefined;
+    };
 
-    const interval = setInterval(checkUnread, 8000);
-    return () => clearInterval(interval);
+    const unsubscribe = messagesApi.subscribe({
+      onUnread: applyUnread,
+      onConnectionChange: (connected) => (connected ? stopPolling() : startPolling()),
+    });
+
+    return () => {
+      unsubscribe();
+      stopPolling();
+    };
   }, []);
 
   // Reset unread when visiting messages page
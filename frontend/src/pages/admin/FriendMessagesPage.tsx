@@ -5,6 +5,10 @@ import ParticlesBackground from '../../components/ParticlesBackground';
 import { messagesApi, Message } from '../../api/messages';
 import { theme } from '../../styles/theme';
 
+// Append a message (oldest first) unless it is already listed
+const withMessage = (messages: Message[], message: Message): Message[] =>
+  messages.some((m) => m.id === message.id) ? messages : [...messages, message];
+
 export default function AdminMessagesPage() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [newContent, setNewContent] = useState('');
@@ -25,9 +29,33 @@ export default function AdminMessagesPage() {
   useEffect(() => {
     loadMessages();
     messagesApi.markRead(); // Mark messages as read when admin views them
-    // Auto refresh every 30 seconds
-    const interval = setInterval(loadMessages, 30000);
-    return () => clearInterval(interval);
+
+    // New / deleted messages arrive over the event stream; refresh by polling only while it is down
+    let pollTimer: number | undefined;
+    const unsubscribe = messagesApi.subscribe({
+      onMessageCreated: (message) => {
+        setMessages((prev) => withMessage(prev, message));
+        // Already on screen, so someone else's message counts as read
+        if (!isFromAdmin(message.sender_username)) {
+          messagesApi.markRead({ up_to_id: message.id });
+        }
+      },
+      onMessageDeleted: (id) => setMessages((prev) => prev.filter((m) => m.id !== id)),
+      onConnectionChange: (connected) => {
+        if (connected && pollTimer !== undefined) {
+          clearInterval(pollTimer);
+          pollTimer = undefined;
+          loadMessages(); // catch up on anything missed while disconnected
+        } else if (!connected && pollTimer === undefined) {
+          pollTimer = window.setInterval(loadMessages, 30000);
+        }
+      },
+    });
+
+    return () => {
+      unsubscribe();
+      clearInterval(pollTimer);
+    };
   }, []);
 
   const handleCreate = async () => {
@@ -37,9 +65,9 @@ export default function AdminMessagesPage() {
       return;
     }
     try {
-      await messagesApi.create({ content: newContent });
+      const created = await messagesApi.create({ content: newContent });
       setNewContent('');
-      loadMessages();
+      setMessages((prev) => withMessage(prev, created));
     } catch (err: any) {
       alert(err.response?.data?.detail || '发送失败');
     }
@@ -49,7 +77,7 @@ export default function AdminMessagesPage() {
     if (!confirm('确定删除这条留言吗？')) return;
     try {
       await messagesApi.delete(id);
-      loadMessages();
+      setMessages((prev) => prev.filter((m) => m.id !== id));
     } catch (err: any) {
       alert(err.response?.data?.detail || '删除失败');
     }
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import Layout from '../../components/Layout';
-import { photosApi, Photo } from '../../api/photos';
+import { photosApi, Photo, signedMediaUrl } from '../../api/photos';
 import { theme } from '../../styles/theme';
 
 export default function PhotoReviewPage() {
@@ -48,10 +48,12 @@ export default function PhotoReviewPage() {
     }
   };
 
-  const getImageUrl = (filename: string) => {
+  const getImageUrl = (photo: Photo) => {
+    const signed = signedMediaUrl(photo.urls, 'medium');
+    if (signed) return signed;
     const apiBaseUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
     const token = localStorage.getItem('token');
-    return `${apiBaseUrl}/photos/${filename}?token=${token}`;
+    return `${apiBaseUrl}/photos/${photo.filename}?token=${token}&size=medium`;
   };
 
   return (
@@ -90,7 +92,7 @@ export default function PhotoReviewPage() {
                   background: '#000'
                 }}>
                   <img 
-                    src={getImageUrl(photo.filename)} 
+                    src={getImageUrl(photo)} 
                     alt={photo.filename}
                     style={{ 
                       width: '100%', 
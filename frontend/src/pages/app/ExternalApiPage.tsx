@@ -19,13 +19,15 @@ export default function ExternalApiPage() {
     setResponse('');
 
     try {
-      const result = await externalApi.call({ prompt });
-      setResponse(result.text);
+      await externalApi.stream({ prompt }, {
+        onDelta: (text) => setResponse((prev) => prev + text),
+      });
     } catch (err: any) {
-      if (err.response?.status === 429) {
-        setError('请求过于频繁，请稍后再试（限制：20次/分钟）');
+      if (err.status === 429) {
+        const wait = err.retryAfter ? `，${err.retryAfter} 秒后可重试` : '，请稍后再试';
+        setError(`请求过于频繁${wait}（限制：20次/分钟）`);
       } else {
-        setError(err.response?.data?.detail || '调用失败');
+        setError(err.message || '调用失败');
       }
     } finally {
       setLoading(false);
@@ -6,6 +6,10 @@ import EasterEgg from '../../components/EasterEgg';
 import { messagesApi, Message } from '../../api/messages';
 import { theme } from '../../styles/theme';
 
+// Append a message (oldest first) unless it is already listed
+const withMessage = (messages: Message[], message: Message): Message[] =>
+  messages.some((m) => m.id === message.id) ? messages : [...messages, message];
+
 export default function MessagesPage() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [newContent, setNewContent] = useState('');
@@ -28,6 +32,33 @@ export default function MessagesPage() {
   useEffect(() => {
     loadMessages();
     messagesApi.markRead();
+
+    // New / deleted messages arrive over the event stream; refresh by polling only while it is down
+    let pollTimer: number | undefined;
+    const unsubscribe = messagesApi.subscribe({
+      onMessageCreated: (message) => {
+        setMessages((prev) => withMessage(prev, message));
+        // Already on screen, so someone else's message counts as read
+        if (message.sender_username !== currentUser) {
+          messagesApi.markRead({ up_to_id: message.id });
+        }
+      },
+      onMessageDeleted: (id) => setMessages((prev) => prev.filter((m) => m.id !== id)),
+      onConnectionChange: (connected) => {
+        if (connected && pollTimer !== undefined) {
+          clearInterval(pollTimer);
+          pollTimer = undefined;
+          loadMessages(); // catch up on anything missed while disconnected
+        } else if (!connected && pollTimer === undefined) {
+          pollTimer = window.setInterval(loadMessages, 30000);
+        }
+      },
+    });
+
+    return () => {
+      unsubscribe();
+      clearInterval(pollTimer);
+    };
   }, []);
 
   const handleCreate = async () => {
@@ -40,9 +71,9 @@ export default function MessagesPage() {
       // 检查是否包含love关键词
       const hasLove = newContent.toLowerCase().includes('love');
       
-      await messagesApi.create({ content: newContent });
+      const created = await messagesApi.create({ content: newContent });
       setNewContent('');
-      await loadMessages();
+      setMessages((prev) => withMessage(prev, created));
       
       // 如果包含love，在消息加载完成后触发彩蛋
       if (hasLove) {
@@ -58,7 +89,7 @@ export default function MessagesPage() {
     if (!confirm('确定删除这条留言吗？')) return;
     try {
       await messagesApi.delete(id);
-      loadMessages();
+      setMessages((prev) => prev.filter((m) => m.id !== id));
     } catch (err: any) {
       alert(err.response?.data?.detail || '删除失败');
     }
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import Layout from '../../components/Layout';
-import { photosApi, Photo } from '../../api/photos';
+import { photosApi, Photo, ImageSize, signedMediaUrl } from '../../api/photos';
 import { theme } from '../../styles/theme';
 import './PicturesPage.css';
 
@@ -28,10 +28,12 @@ export default function PicturesPage() {
     loadPictures();
   }, []);
 
-  const getImageUrl = (filename: string) => {
+  const getImageUrl = (photo: Photo, size: ImageSize = 'original') => {
+    const signed = signedMediaUrl(photo.urls, size);
+    if (signed) return signed;
     const apiBaseUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
     const token = localStorage.getItem('token');
-    return `${apiBaseUrl}/photos/${filename}?token=${token}`;
+    return `${apiBaseUrl}/photos/${photo.filename}?token=${token}&size=${size}`;
   };
 
   const handleUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -171,7 +173,7 @@ export default function PicturesPage() {
                   width: '100%'
                 }}>
                   <img
-                    src={getImageUrl(picture.filename)}
+                    src={getImageUrl(picture, 'thumb')}
                     alt={picture.filename || '照片'}
                     className="picture-image"
                     loading="lazy"
@@ -235,7 +237,7 @@ export default function PicturesPage() {
                 }}
               >
                 <img
-                  src={getImageUrl(selectedImage.filename)}
+                  src={getImageUrl(selectedImage, 'medium')}
                   alt={selectedImage.filename || '照片'}
                   style={{
                     maxWidth: '100%',